@@ -0,0 +1,157 @@
+# ai/BatchEval.py
+
+from models.Board import Board, INFLUENCE_WEIGHTS, INFLUENCE_THRESHOLD
+from models.GameState import EMPTY, BLACK
+from . import Heuristic
+
+# numpy là tùy chọn và chỉ được nạp ở lần đầu gọi available() (nạp numpy mất ~80 ms,
+# không để mọi tiến trình import Minimax phải chịu); thiếu thì chỉ dùng heuristic() thường
+np = None
+_loaded = False
+
+BORDER = 2   # giá trị ô viền khi dò chuỗi / khí (khác EMPTY, BLACK, WHITE)
+
+
+def available() -> bool:
+    global np, _loaded
+    if not _loaded:
+        _loaded = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = None
+    return np is not None
+
+
+def _require():
+    if not available():
+        raise ImportError("ai.BatchEval cần numpy")
+
+
+def collect(board: Board, life=None) -> tuple:
+    """
+    Ghi lại một thế cờ để chấm sau theo lô: lưới (chép lại vì play()/undo() sửa tại chỗ)
+    và hiệu chỉnh Benson, phần duy nhất còn tính theo từng bàn bằng Python.
+    """
+    correction = Heuristic.life_correction(board, life) if life is not None else 0.0
+    return [cell for row in board.grid for cell in row], correction
+
+
+def stack_boards(grids, size: int) -> "np.ndarray":
+    """N lưới (list phẳng hoặc lồng) -> mảng int8 (N, size, size)."""
+    _require()
+    return np.array(grids, dtype=np.int8).reshape(-1, size, size)
+
+
+# ----------------- đặc trưng theo lô -----------------
+
+def _territory(stack) -> "np.ndarray":
+    """
+    Lãnh thổ đen - trắng như Board.influence_territory: bản đồ ảnh hưởng dựng lại bằng
+    tổng các mảng dịch (khoảng cách Manhattan d nhận INFLUENCE_WEIGHTS[d - 1]),
+    loang từng vòng d = 1, 2, ... quanh mỗi quân.
+    """
+    n, size, _ = stack.shape
+    radius = len(INFLUENCE_WEIGHTS)
+    padded = np.zeros((n, size + 2 * radius, size + 2 * radius), dtype=np.int16)
+    padded[:, radius:radius + size, radius:radius + size] = stack
+    influence = np.zeros((n, size, size), dtype=np.int16)
+    for d, weight in enumerate(INFLUENCE_WEIGHTS, 1):
+        ring = np.zeros_like(influence)
+        for dx in range(-d, d + 1):
+            for dy in {d - abs(dx), abs(dx) - d}:
+                ring += padded[:, radius - dx:radius - dx + size, radius - dy:radius - dy + size]
+        influence += weight * ring
+    empty = stack == EMPTY
+    return ((empty & (influence >= INFLUENCE_THRESHOLD)).sum((1, 2)) -
+            (empty & (influence <= -INFLUENCE_THRESHOLD)).sum((1, 2)))
+
+
+def _chains(stack):
+    """
+    (hiệu số khí, số chuỗi trắng bị đe dọa - đen bị đe dọa) của N bàn, như extract_features.
+    Chuỗi được gán nhãn bằng cách lan nhãn lớn nhất qua các ô kề cùng màu (độ dời ±1, ±width
+    trên bàn có viền) kèm nhảy con trỏ; khí là các cặp (chuỗi, ô trống kề) khác nhau.
+    """
+    n, size, _ = stack.shape
+    width = size + 2
+    area = width * width
+    padded = np.full((n, width, width), BORDER, dtype=np.int8)
+    padded[:, 1:-1, 1:-1] = stack
+    cells = padded.ravel()
+    stones = np.flatnonzero((cells == BLACK) | (cells == -BLACK))
+    m = len(stones)
+    if m == 0:
+        return np.zeros(n), np.zeros(n)
+    colors = cells[stones]
+    index = np.full(len(cells), -1, dtype=np.int64)
+    index[stones] = np.arange(m)
+
+    # neighbours[k]: chỉ số (trong stones) của ô kề hướng k nếu cùng màu, không thì chính nó
+    offsets = (-width, width, -1, 1)
+    neighbours = np.empty((5, m), dtype=np.int64)
+    neighbours[0] = np.arange(m)
+    for k, offset in enumerate(offsets, 1):
+        around = stones + offset
+        neighbours[k] = np.where(cells[around] == colors, index[around], neighbours[0])
+
+    label = neighbours[0]
+    while True:
+        spread = label[neighbours].max(0)
+        spread = spread[spread]
+        if np.array_equal(spread, label):
+            break
+        label = spread
+
+    # khí: mỗi ô trống tính một lần cho mỗi chuỗi kề nó (bỏ chuỗi đã gặp ở hướng trước)
+    empties = np.flatnonzero(cells == EMPTY)
+    seen = []
+    owners = []
+    for offset in offsets:
+        around = index[empties + offset]
+        owner = np.where(around >= 0, label[around], -1)
+        first = owner >= 0
+        for other in seen:
+            first &= owner != other
+        seen.append(owner)
+        owners.append(owner[first])
+    owner = np.concatenate(owners)
+    board_of = stones // area
+    liberties = np.bincount(board_of[owner], weights=colors[owner], minlength=n)
+
+    counts = np.bincount(owner, minlength=m)
+    roots = np.flatnonzero(label == np.arange(m))
+    low = roots[counts[roots] <= 2]
+    threatened = np.bincount(board_of[low], weights=-colors[low], minlength=n)
+    return liberties, threatened
+
+
+def features(stack) -> tuple:
+    """(số quân, khí, chuỗi bị đe dọa, lãnh thổ) theo góc nhìn quân đen, mỗi thứ một mảng N."""
+    _require()
+    stones = stack.sum((1, 2), dtype=np.int64)
+    liberties, threatened = _chains(stack)
+    return stones, liberties, threatened, _territory(stack)
+
+
+def evaluate_batch(snapshots, ai_color: int, size: int = None) -> "np.ndarray":
+    """
+    Chấm N thế cờ (kết quả của collect) trong một lần gọi, trả về mảng N điểm theo góc nhìn
+    ai_color. Cùng số hạng, cùng trọng số Heuristic.WEIGHTS và cùng thứ tự cộng với
+    heuristic(), nên giá trị trùng với heuristic(board, ai_color, life).
+    """
+    _require()
+    grids, corrections = zip(*snapshots)
+    if size is None:
+        size = int(round(len(grids[0]) ** 0.5))
+    stones, liberties, threatened, territory = features(stack_boards(grids, size))
+    w = Heuristic.WEIGHTS
+    score = (
+        w["stone"] * stones +
+        w["liberty"] * liberties +
+        w["threat"] * threatened +
+        w["territory"] * territory
+    )
+    score += np.array(corrections)
+    return score if ai_color == BLACK else -score
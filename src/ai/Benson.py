@@ -0,0 +1,121 @@
+# ai/Benson.py
+
+from dataclasses import dataclass
+from typing import FrozenSet, Tuple
+from models.Board import Board
+from models.GameState import EMPTY, BLACK, WHITE
+
+CACHE_LIMIT = 1 << 16   # số thế cờ tối đa trong cache, đầy thì xóa hết làm lại
+
+# (size, Board.hash) -> LifeStatus
+_CACHE = {}
+
+_NONE = frozenset()
+
+
+@dataclass(slots=True)
+class LifeStatus:
+    """
+    Kết quả thuật toán Benson cho cả hai màu.
+    *_alive: các quân sống vô điều kiện; *_anchors: mỗi chuỗi sống một quân đại diện;
+    *_regions: các điểm thuộc vùng sống (vital region), gồm ô trống và quân đối thủ
+    đã chết bên trong.
+    """
+    black_alive: FrozenSet[Tuple[int, int]] = _NONE
+    white_alive: FrozenSet[Tuple[int, int]] = _NONE
+    black_anchors: Tuple[Tuple[int, int], ...] = ()
+    white_anchors: Tuple[Tuple[int, int], ...] = ()
+    black_regions: FrozenSet[Tuple[int, int]] = _NONE
+    white_regions: FrozenSet[Tuple[int, int]] = _NONE
+    black_captives: int = 0     # số quân trắng chết trong vùng sống của đen
+    white_captives: int = 0
+
+    @property
+    def settled(self) -> FrozenSet[Tuple[int, int]]:
+        """Các điểm đã ngã ngũ: đi vào đó không đổi được sống chết của bên nào."""
+        return self.black_regions | self.white_regions
+
+
+def _benson(board: Board, color: int):
+    """
+    Benson cho một màu: trả về (quân sống, quân đại diện từng chuỗi sống,
+    điểm vùng sống, số quân chết bên trong).
+    """
+    chains = [(stones, libs) for c, stones, libs in board.iter_chains() if c == color]
+    if len(chains) == 0:
+        return _NONE, (), _NONE, 0
+    grid = board.grid
+    chain_of = {}
+    for index, (stones, _) in enumerate(chains):
+        for point in stones:
+            chain_of[point] = index
+
+    # Vùng: thành phần liên thông của các điểm không phải quân color
+    seen = set()
+    regions = []    # (các điểm, các ô trống, tập chuỗi bao quanh)
+    for x in range(board.size):
+        for y in range(board.size):
+            if grid[x][y] == color or (x, y) in seen:
+                continue
+            seen.add((x, y))
+            points = [(x, y)]
+            border = set()
+            for px, py in points:
+                for nx, ny in board.neighbors(px, py):
+                    if grid[nx][ny] == color:
+                        border.add(chain_of[(nx, ny)])
+                    elif (nx, ny) not in seen:
+                        seen.add((nx, ny))
+                        points.append((nx, ny))
+            empties = [(px, py) for px, py in points if grid[px][py] == EMPTY]
+            regions.append((points, empties, border))
+
+    # Vùng là vital của chuỗi nếu mọi ô trống trong vùng đều là khí của chuỗi đó
+    vital = [set() for _ in chains]
+    for r, (_, empties, border) in enumerate(regions):
+        for i in border:
+            libs = chains[i][1]
+            if all(point in libs for point in empties):
+                vital[i].add(r)
+
+    alive = {i for i in range(len(chains)) if len(vital[i]) >= 2}
+    healthy = {r for r in range(len(regions)) if regions[r][2] and regions[r][2] <= alive}
+    while True:
+        # bỏ chuỗi không còn 2 vùng vital lành, rồi bỏ vùng chạm chuỗi đã bị loại
+        removed = {i for i in alive if len(vital[i] & healthy) < 2}
+        if not removed:
+            break
+        alive -= removed
+        healthy = {r for r in healthy if regions[r][2] <= alive}
+    if not alive:
+        return _NONE, (), _NONE, 0
+
+    stones = frozenset(p for i in alive for p in chains[i][0])
+    anchors = tuple(next(iter(chains[i][0])) for i in sorted(alive))
+    owned = set()
+    captives = 0
+    for r in healthy:
+        if any(r in vital[i] for i in regions[r][2]):
+            points, empties, _ = regions[r]
+            owned.update(points)
+            captives += len(points) - len(empties)
+    return stones, anchors, frozenset(owned), captives
+
+
+def unconditional_life(board: Board) -> LifeStatus:
+    """
+    Chuỗi sống vô điều kiện và vùng sống của cả hai màu, cache theo Board.hash.
+    Chuỗi sống vô điều kiện không thể bị bắt dù chủ của nó không đi thêm nước nào,
+    miễn là không tự đi vào vùng sống của mình.
+    """
+    key = (board.size, board.hash)
+    status = _CACHE.get(key)
+    if status is None:
+        if len(_CACHE) >= CACHE_LIMIT:
+            _CACHE.clear()
+        b_alive, b_anchors, b_regions, b_captives = _benson(board, BLACK)
+        w_alive, w_anchors, w_regions, w_captives = _benson(board, WHITE)
+        status = LifeStatus(b_alive, w_alive, b_anchors, w_anchors, b_regions, w_regions,
+                            b_captives, w_captives)
+        _CACHE[key] = status
+    return status
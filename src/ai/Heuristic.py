@@ -1,42 +1,85 @@
 # ai/Heuristic.py
 
 from models.Board import Board
-from models.GameState import BLACK, WHITE
+from models.GameState import EMPTY, BLACK, WHITE
+from .Benson import LifeStatus
 
+# Trọng số (đã tinh chỉnh để AI chơi hợp lý); arena.py có thể thay để so sánh cấu hình
+WEIGHTS = {
+    "stone": 10.0,
+    "liberty": 1.3,
+    "threat": 18.0,      # cứu quân mình / ăn quân địch là ưu tiên cao
+    "territory": 11.0,
+}
 
-def heuristic(board: Board, ai_color: int) -> float:
+
+def heuristic(board: Board, ai_color: int, life: LifeStatus = None) -> float:
     """
     Heuristic mạnh cho Go 9x9 - đủ để AI chơi khá thông minh
+    life: kết quả Benson (ai/Benson.py) của thế cờ này hoặc của một thế cờ tổ tiên
+    trong cây tìm kiếm (sống vô điều kiện thì vẫn sống ở các nút con).
     """
     # Nếu đã game over (tương lai sẽ xử lý), trả giá trị cực đại
     # if board.is_game_over(): ...
 
-    # 1. Số quân
-    ai_stones = board.count_stones(ai_color)
-    opp_stones = board.count_stones(-ai_color)
+    # Một lần duyệt bàn cờ cho tất cả đặc trưng của cả hai màu:
+    # 1. số quân, 2. tổng số khí, 3. số nhóm bị đe dọa (<= 2 khí),
+    # 4. ước lượng lãnh thổ (rất quan trọng cuối game)
+    f = board.extract_features()
 
-    # 2. Tổng số khí
-    ai_libs = board.count_total_liberties(ai_color)
-    opp_libs = board.count_total_liberties(-ai_color)
+    w_stone = WEIGHTS["stone"]
+    w_lib = WEIGHTS["liberty"]
+    w_threat = WEIGHTS["threat"]
+    w_territory = WEIGHTS["territory"]
 
-    # 3. Số nhóm đang bị đe dọa (có <=2 liberties)
-    ai_threatened = board.count_threatened_groups(ai_color)
-    opp_threatened = board.count_threatened_groups(-ai_color)
+    # Tính theo góc nhìn quân đen rồi đổi dấu nếu AI cầm trắng
+    score = (
+        w_stone * (f.black_stones - f.white_stones) +
+        w_lib * (f.black_liberties - f.white_liberties) +
+        w_threat * (f.white_threatened - f.black_threatened) +   # ưu tiên ăn quân địch hơn cứu mình
+        w_territory * (f.black_territory - f.white_territory)
+    )
+    if life is not None:
+        score += life_correction(board, life)
+    if ai_color == WHITE:
+        score = -score
 
-    # 4. Ước lượng lãnh thổ (rất quan trọng cuối game)
-    ai_territory, opp_territory = board.estimate_territory()
+    return score
 
-    # Trọng số (đã tinh chỉnh để AI chơi hợp lý)
-    w_stone = 10.0
-    w_lib = 1.3
-    w_threat = 18.0        # cứu quân mình / ăn quân địch là ưu tiên cao
-    w_territory = 11.0
 
-    score = (
-        w_stone * (ai_stones - opp_stones) +
-        w_lib * (ai_libs - opp_libs) +
-        w_threat * (opp_threatened - ai_threatened) +   # ưu tiên ăn quân địch hơn cứu mình
-        w_territory * (ai_territory - opp_territory)
+def life_correction(board: Board, life: LifeStatus) -> float:
+    """
+    Phần hiệu chỉnh theo Benson (góc nhìn quân đen), dùng chung với ai/BatchEval.py:
+    chuỗi sống vô điều kiện không còn bị đe dọa dù ít khí;
+    vùng sống chắc chắn là lãnh thổ: chỉ cộng phần bản đồ ảnh hưởng chưa tính đúng.
+    """
+    return (
+        WEIGHTS["threat"] * (
+            _low_liberty(board, life.black_anchors) - _low_liberty(board, life.white_anchors)
+        ) +
+        WEIGHTS["stone"] * (life.black_captives - life.white_captives) +
+        WEIGHTS["territory"] * (
+            _uncounted(board, life.black_regions, BLACK) - _uncounted(board, life.white_regions, WHITE)
+        )
     )
 
-    return score
\ No newline at end of file
+
+def _low_liberty(board: Board, anchors) -> int:
+    # số chuỗi (sống vô điều kiện) đang bị extract_features() tính là bị đe dọa
+    return sum(1 for x, y in anchors if len(board.get_group_and_liberties(x, y)[1]) <= 2)
+
+
+def _uncounted(board: Board, region, color: int) -> int:
+    """
+    Điểm trong vùng sống của color mà số hạng lãnh thổ (bản đồ ảnh hưởng) chưa tính cho color:
+    quân chết và ô trống trung lập +1, ô trống bị tính cho đối phương +2 (bù phần tính sai).
+    """
+    total = 0
+    for x, y in region:
+        if not board.is_empty(x, y):
+            total += 1
+        else:
+            owner = board.ownership(x, y)
+            if owner != color:
+                total += 1 if owner == EMPTY else 2
+    return total
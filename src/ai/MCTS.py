@@ -0,0 +1,211 @@
+# ai/MCTS.py
+
+import math
+import random
+import time
+from models.Board import Board
+from models.GameState import BLACK, WHITE
+from .Benson import unconditional_life
+
+KOMI = 7.5
+EXPLORATION = 1.4       # hằng số C của UCT
+PLAYOUT_LIMIT = 3 * 81  # trần số nước của một ván giả lập (không xét superko trong playout)
+
+
+def is_eye(board: Board, x: int, y: int, color: int) -> bool:
+    """
+    Mắt đơn giản: mọi điểm kề đều là quân color và đối thủ chiếm không quá
+    1 góc chéo (ở biên / góc thì không được chiếm góc chéo nào).
+    Playout không bao giờ tự lấp mắt của mình.
+    """
+    grid = board.grid
+    for nx, ny in board.neighbors(x, y):
+        if grid[nx][ny] != color:
+            return False
+    enemy_corners = 0
+    off_board = 0
+    for dx, dy in ((-1, -1), (-1, 1), (1, -1), (1, 1)):
+        nx, ny = x + dx, y + dy
+        if not board.in_bounds(nx, ny):
+            off_board = 1
+        elif grid[nx][ny] == -color:
+            enemy_corners += 1
+    return enemy_corners + off_board < 2
+
+
+class MCTSNode:
+    __slots__ = ("move", "parent", "children", "untried", "visits", "wins", "color", "key", "passes")
+
+    def __init__(self, move, parent, color: int, key: int, passes: int = 0):
+        self.move = move          # nước dẫn tới nút này (None = pass)
+        self.parent = parent
+        self.children = []
+        self.untried = None       # sinh khi nút được mở rộng lần đầu
+        self.visits = 0
+        self.wins = 0.0           # số ván thắng của bên vừa đi nước `move`
+        self.color = color        # bên tới lượt đi tại nút này
+        self.key = key            # Board.hash của thế cờ tại nút
+        self.passes = passes      # số lần pass liên tiếp ngay trước thế cờ này
+
+    def uct_child(self, c: float):
+        log_n = math.log(self.visits)
+        return max(
+            self.children,
+            key=lambda ch: ch.wins / ch.visits + c * math.sqrt(log_n / ch.visits),
+        )
+
+
+class MCTS:
+    """
+    Monte Carlo Tree Search (UCT) với playout ngẫu nhiên nhẹ có tránh lấp mắt.
+    Dừng theo time_budget (giây) hoặc max_playouts; cây con của nước vừa đi
+    được giữ lại cho lượt sau. stats ghi số playout và playout/giây của lượt gần nhất.
+    """
+
+    def __init__(self, ai_color: int, time_budget: float = 2.0, max_playouts: int = None,
+                 exploration: float = EXPLORATION, komi: float = KOMI, seed: int = None):
+        self.ai_color = ai_color
+        self.time_budget = time_budget
+        self.max_playouts = max_playouts
+        self.exploration = exploration
+        self.komi = komi
+        self.rng = random.Random(seed)
+        self.root = None
+        self.stats = {"playouts": 0, "seconds": 0.0, "playouts_per_second": 0.0, "reused_visits": 0}
+
+    # ---------- tái sử dụng cây ----------
+    def _take_root(self, board: Board, passes: int) -> MCTSNode:
+        # Cây cũ có gốc là thế cờ sau nước AI vừa đi; tìm nút ứng với nước trả lời của đối thủ
+        if self.root is not None:
+            for child in self.root.children:
+                if child.key == board.hash and child.passes == passes:
+                    child.parent = None
+                    return child
+        return MCTSNode(None, None, self.ai_color, board.hash, passes)
+
+    @staticmethod
+    def _is_terminal(node: MCTSNode) -> bool:
+        # hai bên pass liên tiếp → hết ván (đếm cả các lần pass trước gốc, theo GameState)
+        return node.passes >= 2
+
+    # ---------- sinh nước ----------
+    def _candidate_moves(self, board: Board, color: int):
+        # bỏ mắt của mình và các điểm trong vùng đã ngã ngũ (Benson, cache theo hash)
+        settled = unconditional_life(board).settled
+        moves = [
+            m for m in board.legal_moves(color)
+            if m not in settled and not is_eye(board, m[0], m[1], color)
+        ]
+        self.rng.shuffle(moves)
+        return moves or [None]
+
+    def _playout(self, board: Board, color: int, passes: int = 0) -> int:
+        """Chơi ngẫu nhiên tới khi hai bên cùng pass, trả về bên thắng."""
+        for _ in range(PLAYOUT_LIMIT):
+            if passes >= 2:
+                break
+            moves = board.legal_moves(color)
+            played = False
+            while moves:
+                i = self.rng.randrange(len(moves))
+                x, y = moves[i]
+                if not is_eye(board, x, y, color) and board.apply_move(x, y, color):
+                    played = True
+                    break
+                moves[i] = moves[-1]
+                moves.pop()
+            passes = 0 if played else passes + 1
+            color = -color
+        return self._winner(board)
+
+    def _winner(self, board: Board) -> int:
+        # Luật Trung Quốc: quân trên bàn + lãnh thổ, trắng được komi
+        black_stones, white_stones = board.count_stones()
+        black_terr, white_terr = board.estimate_territory()
+        black = black_stones + black_terr
+        white = white_stones + white_terr + self.komi
+        return BLACK if black > white else WHITE
+
+    # ---------- vòng lặp chính ----------
+    def search(self, board: Board, stop=None, passes: int = 0):
+        """passes: số lần pass liên tiếp ngay trước thế cờ hiện tại (GameState.consecutive_passes)."""
+        root = self._take_root(board, passes)
+        self.stats["reused_visits"] = root.visits
+        work = board.copy()
+        start = time.perf_counter()
+        deadline = start + self.time_budget if self.time_budget is not None else None
+        playouts = 0
+
+        while True:
+            if self.max_playouts is not None and playouts >= self.max_playouts:
+                break
+            # kiểm tra mỗi playout: perf_counter rẻ hơn nhiều so với một playout,
+            # thưa hơn thì ngân sách ngắn bị vượt cả chục playout
+            if stop is not None and stop.is_set():
+                break
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+
+            # 1. Chọn: đi xuống theo UCT tới nút còn nước chưa thử
+            node = root
+            depth = 0
+            while node.untried is not None and not node.untried and node.children \
+                    and not self._is_terminal(node):
+                child = node.uct_child(self.exploration)
+                if child.move is not None:
+                    if not work.play(child.move[0], child.move[1], node.color):
+                        # nước bị superko chặn trên đường đi hiện tại (cây tái sử dụng)
+                        node.children.remove(child)
+                        continue
+                    depth += 1
+                node = child
+
+            # 2. Mở rộng một nước
+            if node.untried is None and not self._is_terminal(node):
+                node.untried = self._candidate_moves(work, node.color)
+            while node.untried:
+                move = node.untried.pop()
+                if move is not None:
+                    if not work.play(move[0], move[1], node.color):
+                        continue
+                    depth += 1
+                child = MCTSNode(move, node, -node.color, work.hash,
+                                 node.passes + 1 if move is None else 0)
+                node.children.append(child)
+                node = child
+                break
+
+            # 3. Playout trên bản sao không giữ history (bỏ qua superko cho nhanh)
+            if self._is_terminal(node):
+                winner = self._winner(work)
+            else:
+                sim = work.copy()
+                sim.history = None
+                winner = self._playout(sim, node.color, node.passes)
+            playouts += 1
+
+            # 4. Lan truyền kết quả ngược lên gốc
+            while node is not None:
+                node.visits += 1
+                if winner == -node.color:
+                    node.wins += 1
+                node = node.parent
+            for _ in range(depth):
+                work.undo()
+
+        elapsed = time.perf_counter() - start
+        self.stats["playouts"] = playouts
+        self.stats["seconds"] = elapsed
+        self.stats["playouts_per_second"] = playouts / elapsed if elapsed > 0 else 0.0
+        return root
+
+    def choose_move(self, board: Board, stop=None, passes: int = 0):
+        """Trả về (row, col) của nút con được thăm nhiều nhất, hoặc None để pass."""
+        root = self.search(board, stop, passes)
+        if not root.children:
+            self.root = None
+            return None
+        best = max(root.children, key=lambda ch: ch.visits)
+        best.parent = None
+        self.root = best
+        return best.move
@@ -1,62 +1,478 @@
 # ai/minimax.py
 
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
 from models.Board import Board
 from .Heuristic import heuristic
+from . import Patterns
+from .Benson import unconditional_life
+from .SearchStats import SearchStats
+from .Tactics import tactical_moves
+from .TranspositionTable import TranspositionTable, EXACT, LOWER, UPPER
 
 INF = 10 ** 9
-MAX_DEPTH = 2  # độ sâu L (bạn giải thích trong báo cáo)
+MAX_DEPTH = 6       # độ sâu tối đa của iterative deepening
+TIME_BUDGET = 2.0   # thời gian suy nghĩ mặc định cho mỗi nước (giây)
+QS_DEPTH = 4        # số nước chiến thuật tối đa được mở thêm ở đường chân trời
 
+# XOR vào Board.hash khi tới lượt bên cực đại, để cùng thế cờ nhưng khác lượt đi không trùng khóa
+SIDE_KEY = 0x9E3779B97F4A7C15
 
-def minimax(board: Board, depth: int, maximizing: bool, ai_color: int,
-            alpha: float = -INF, beta: float = INF):
-    if depth == 0:
-        return heuristic(board, ai_color), None
 
+class SearchTimeout(Exception):
+    """Hết thời gian (hoặc bị yêu cầu dừng) giữa chừng một vòng lặp sâu dần."""
+
+
+class SearchContext:
+    """
+    Trạng thái dùng chung trong một lượt tìm kiếm: hạn chót, cờ dừng (threading.Event
+    do controller đặt khi hủy), killer move theo ply, điểm history theo nước đi,
+    nước tốt nhất ở gốc của vòng trước và số liệu SearchStats.
+    """
+
+    def __init__(self, deadline: float = None, stop=None, quiescence: bool = True,
+                 patterns: bool = True):
+        self.deadline = deadline
+        self.stop = stop
+        # bảng mẫu 3x3: loại nước rõ ràng dở và xếp các nước còn lại theo điểm mẫu
+        self.patterns = Patterns.default_table() if patterns else None
+        # kết quả Benson ở gốc: vẫn đúng cho cả cây vì không bên nào được đi vào vùng đã ngã ngũ
+        self.life = None
+        self.settled = frozenset()
+        # mở rộng nước bắt / chạy / atari ở lá thay vì chấm ngay thế cờ chưa ổn định
+        self.quiescence = quiescence
+        self.nodes = 0
+        self.root_depth = 0
+        self.root_move = None
+        # (giá trị, nước) dự phòng ở gốc: hạn chót chỉ cắt tìm kiếm khi đã có nó
+        self.root_best = None
+        self.killers = {}   # ply -> [killer1, killer2]
+        self.history = {}   # move -> điểm cộng dồn mỗi lần gây cắt tỉa
+        self.stats = SearchStats()
+
+    def attach_life(self, board: Board):
+        self.life = unconditional_life(board)
+        self.settled = self.life.settled
+
+    def evaluate(self, board: Board, ai_color: int) -> float:
+        stats = self.stats
+        started = time.perf_counter()
+        value = heuristic(board, ai_color, self.life)
+        stats.eval_seconds += time.perf_counter() - started
+        stats.evals += 1
+        return value
+
+    def check_time(self):
+        self.nodes += 1
+        # nút quiescence có thể tốn ~0.5 ms (tactical_moves): xem đồng hồ mỗi 16 nút
+        if (self.nodes & 15) == 0:
+            if self.stop is not None and self.stop.is_set():
+                raise SearchTimeout
+            if (self.deadline is not None and self.root_best is not None
+                    and time.perf_counter() > self.deadline):
+                raise SearchTimeout
+
+    def order_moves(self, legal, tt_move, ply: int):
+        # history giảm dần (sắp xếp ổn định nên giữ thứ tự điểm mẫu), rồi killer,
+        # rồi nước PV/bảng chuyển vị lên đầu
+        history = self.history
+        legal.sort(key=lambda m: -history.get(m, 0))
+        for killer in reversed(self.killers.get(ply, ())):
+            if killer in legal and killer != tt_move:
+                legal.remove(killer)
+                legal.insert(0, killer)
+        if tt_move is None and ply == 0:
+            tt_move = self.root_move
+        if tt_move is not None and tt_move in legal:
+            legal.remove(tt_move)
+            legal.insert(0, tt_move)
+
+    def record_cutoff(self, move, depth: int, ply: int, index: int):
+        self.stats.record_cutoff(index)
+        killers = self.killers.setdefault(ply, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[2:]
+        self.history[move] = self.history.get(move, 0) + depth * depth
+
+
+def minimax(board: Board, depth: int, maximizing: bool, ai_color: int,
+            alpha: float = -INF, beta: float = INF, tt: TranspositionTable = None,
+            ctx: SearchContext = None):
+    # Duyệt cây bằng play()/undo() trên cùng một bàn cờ, không tạo bản sao
+    if ctx is not None:
+        ctx.check_time()
+    alpha_orig, beta_orig = alpha, beta
     current_color = ai_color if maximizing else -ai_color
-    legal = board.legal_moves(current_color)
+    key = board.hash ^ SIDE_KEY if maximizing else board.hash
+    tt_move = None
+    if tt is not None:
+        entry = tt.probe(key)
+        if entry is not None:
+            _, e_depth, e_value, e_flag, tt_move, _ = entry
+            # nước lưu trong bảng có thể bị superko chặn trên đường đi hiện tại
+            usable = tt_move is None or board.is_legal(tt_move[0], tt_move[1], current_color)
+            if e_depth >= depth and usable:
+                if e_flag == EXACT:
+                    return e_value, tt_move
+                if e_flag == LOWER:
+                    alpha = max(alpha, e_value)
+                else:
+                    beta = min(beta, e_value)
+                if beta <= alpha:
+                    return e_value, tt_move
 
-    if not legal:
-        return heuristic(board, ai_color), None
+    if depth == 0:
+        if ctx is not None and ctx.quiescence:
+            value = quiescence(board, maximizing, ai_color, alpha, beta, ctx)
+            flag = UPPER if value <= alpha else LOWER if value >= beta else EXACT
+        else:
+            value = ctx.evaluate(board, ai_color) if ctx is not None else heuristic(board, ai_color)
+            flag = EXACT
+        if tt is not None:
+            tt.store(key, 0, value, flag, None)
+        return value, None
+
+    if ctx is None:
+        legal = board.legal_moves(current_color)
+        if not legal:
+            return heuristic(board, ai_color), None
+        ply = 0
+        if tt_move is not None and tt_move in legal:
+            legal.remove(tt_move)
+            legal.insert(0, tt_move)
+    else:
+        started = time.perf_counter()
+        legal = board.legal_moves(current_color)
+        if ctx.settled:
+            legal = [move for move in legal if move not in ctx.settled]
+        # Sắp thứ tự nước đi để alpha-beta cắt tỉa sớm hơn
+        ply = ctx.root_depth - depth
+        if legal:
+            if ctx.patterns is not None:
+                legal = ctx.patterns.candidates(board, legal, current_color, tt_move)
+            ctx.order_moves(legal, tt_move, ply)
+        ctx.stats.movegen_seconds += time.perf_counter() - started
+        if not legal:
+            return ctx.evaluate(board, ai_color), None
 
     best_move = None
 
     if maximizing:
         best_value = -INF
-        for move in legal:
-            nb = board.copy()
-            if not nb.apply_move(move[0], move[1], current_color):
+        for index, move in enumerate(legal):
+            if not board.play(move[0], move[1], current_color):
                 continue
-            val, _ = minimax(nb, depth - 1, False, ai_color, alpha, beta)
+            val, _ = minimax(board, depth - 1, False, ai_color, alpha, beta, tt, ctx)
+            board.undo()
             if val > best_value:
                 best_value = val
                 best_move = move
+                if ply == 0 and ctx is not None and ctx.root_depth == 1:
+                    ctx.root_best = (best_value, best_move)
             alpha = max(alpha, best_value)
             if beta <= alpha:
+                if ctx is not None:
+                    ctx.record_cutoff(move, depth, ply, index)
                 break
-        return best_value, best_move
     else:
         best_value = INF
-        for move in legal:
-            nb = board.copy()
-            if not nb.apply_move(move[0], move[1], current_color):
+        for index, move in enumerate(legal):
+            if not board.play(move[0], move[1], current_color):
                 continue
-            val, _ = minimax(nb, depth - 1, True, ai_color, alpha, beta)
+            val, _ = minimax(board, depth - 1, True, ai_color, alpha, beta, tt, ctx)
+            board.undo()
             if val < best_value:
                 best_value = val
                 best_move = move
             beta = min(beta, best_value)
             if beta <= alpha:
+                if ctx is not None:
+                    ctx.record_cutoff(move, depth, ply, index)
+                break
+
+    if tt is not None and best_move is not None:
+        if best_value <= alpha_orig:
+            flag = UPPER
+        elif best_value >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        tt.store(key, depth, best_value, flag, best_move)
+    return best_value, best_move
+
+
+def quiescence(board: Board, maximizing: bool, ai_color: int, alpha: float, beta: float,
+               ctx: SearchContext = None, qdepth: int = QS_DEPTH) -> float:
+    """
+    Tìm kiếm tĩnh ở đường chân trời: chỉ mở các nước bắt quân, chạy khỏi atari
+    và atari dẫn tới thang (ai/Tactics.py). Bên tới lượt luôn có thể dừng lại
+    (stand pat, tương đương pass) với giá trị heuristic hiện tại.
+    """
+    if ctx is not None:
+        ctx.check_time()
+        stats = ctx.stats
+        stats.qnodes += 1
+        ply = ctx.root_depth + QS_DEPTH - qdepth
+        if ply > stats.seldepth:
+            stats.seldepth = ply
+        stand_pat = ctx.evaluate(board, ai_color)
+    else:
+        stand_pat = heuristic(board, ai_color)
+    if qdepth == 0:
+        return stand_pat
+    color = ai_color if maximizing else -ai_color
+
+    if maximizing:
+        if stand_pat >= beta:
+            return stand_pat
+        best = stand_pat
+        alpha = max(alpha, stand_pat)
+        for move in _tactical(board, color, ctx):
+            if not board.play(move[0], move[1], color):
+                continue
+            val = quiescence(board, False, ai_color, alpha, beta, ctx, qdepth - 1)
+            board.undo()
+            best = max(best, val)
+            alpha = max(alpha, val)
+            if beta <= alpha:
+                break
+        return best
+
+    if stand_pat <= alpha:
+        return stand_pat
+    best = stand_pat
+    beta = min(beta, stand_pat)
+    for move in _tactical(board, color, ctx):
+        if not board.play(move[0], move[1], color):
+            continue
+        val = quiescence(board, True, ai_color, alpha, beta, ctx, qdepth - 1)
+        board.undo()
+        best = min(best, val)
+        beta = min(beta, val)
+        if beta <= alpha:
+            break
+    return best
+
+
+def _tactical(board: Board, color: int, ctx: SearchContext):
+    if ctx is None:
+        return tactical_moves(board, color)
+    started = time.perf_counter()
+    moves = tactical_moves(board, color, ctx.settled)
+    ctx.stats.movegen_seconds += time.perf_counter() - started
+    return moves
+
+
+# ----------------- tìm kiếm song song ở gốc -----------------
+
+# Pool tiến trình dùng chung theo số worker, giữ suốt chương trình
+_EXECUTORS = {}
+# Bảng chuyển vị riêng của mỗi tiến trình worker, giữ giữa các lần gọi trong một ván.
+# Giá trị lưu theo góc nhìn bên tìm kiếm nên mỗi màu một bảng (như GtpEngine.tts);
+# _GAME tăng ở new_game() và được gửi kèm mỗi việc để worker xóa bảng khi sang ván mới.
+_WORKER_TTS = {}
+_WORKER_GAME = 0
+_GAME = 0
+
+
+def get_executor(workers: int) -> "ProcessPoolExecutor":
+    # multiprocessing chỉ được nạp khi thật sự chạy song song
+    from concurrent.futures import ProcessPoolExecutor
+    if workers not in _EXECUTORS:
+        _EXECUTORS[workers] = ProcessPoolExecutor(max_workers=workers)
+    return _EXECUTORS[workers]
+
+
+def new_game():
+    """Gọi khi bắt đầu ván mới: bảng chuyển vị trong các worker được xóa ở lần tìm kiếm tới."""
+    global _GAME
+    _GAME += 1
+
+
+def _search_child(data: bytes, move, depth: int, ai_color: int, alpha: float,
+                  time_budget: float = None, tt: TranspositionTable = None, stop=None,
+                  game: int = 0):
+    """
+    Đánh giá một nước ở gốc với cận alpha hiện tại. Chạy trong worker
+    (thế cờ gửi sang dạng Board.serialize()) hoặc ngay tại chỗ ở chế độ tuần tự.
+    Trả về None nếu hết thời gian.
+    """
+    global _WORKER_GAME
+    if tt is None:
+        if game != _WORKER_GAME:
+            _WORKER_TTS.clear()
+            _WORKER_GAME = game
+        tt = _WORKER_TTS.get(ai_color)
+        if tt is None:
+            tt = _WORKER_TTS[ai_color] = TranspositionTable()
+    board = Board.deserialize(data)
+    board.play(move[0], move[1], ai_color)
+    ctx = SearchContext(time.perf_counter() + time_budget if time_budget is not None else None, stop)
+    ctx.root_depth = depth
+    # bên gọi đã có nước dự phòng nên hạn chót được cắt ngay
+    ctx.root_best = (alpha, move)
+    ctx.attach_life(board)
+    try:
+        value, _ = minimax(board, depth - 1, False, ai_color, alpha, INF, tt, ctx)
+    except SearchTimeout:
+        return None
+    return value
+
+
+def search_root_moves(board: Board, ai_color: int, depth: int, workers: int = 1,
+                      first_move=None, time_budget: float = None, tt: TranspositionTable = None,
+                      stop=None, partial: bool = False):
+    """
+    Chia các nước ở gốc cho các worker theo kiểu young-brothers-wait: nước đầu
+    (PV của vòng trước) được tìm trước để có alpha, các nước còn lại được gửi đi
+    với alpha tốt nhất tại thời điểm gửi. workers=1 chạy tuần tự cùng thuật toán
+    và cho cùng kết quả: giá trị lớn nhất, hòa thì lấy nước đứng trước.
+    Trả về (value, move), hoặc None nếu hết thời gian / bị dừng.
+    partial=True (vòng đầu): nước đầu tìm không giới hạn thời gian, hết giờ thì trả về
+    nước tốt nhất trong các nước đã tìm xong.
+    """
+    life = unconditional_life(board)
+    moves = [move for move in board.legal_moves(ai_color) if move not in life.settled]
+    if not moves:
+        return heuristic(board, ai_color, life), None
+    moves = Patterns.default_table().candidates(board, moves, ai_color, first_move)
+    if first_move in moves:
+        moves.remove(first_move)
+        moves.insert(0, first_move)
+
+    data = board.serialize()
+    results = [None] * len(moves)
+    alpha = -INF
+
+    if workers <= 1:
+        start = time.perf_counter()
+        for i, move in enumerate(moves):
+            remaining = None
+            if time_budget is not None and not (partial and i == 0):
+                remaining = time_budget - (time.perf_counter() - start)
+            value = _search_child(data, move, depth, ai_color, alpha, remaining, tt, stop, _GAME)
+            if value is None:
+                break
+            results[i] = value
+            alpha = max(alpha, value)
+    else:
+        executor = get_executor(workers)
+        start = time.perf_counter()
+        pending = list(enumerate(moves))
+        running = {}
+        while pending or running:
+            # nước đầu chạy một mình (young brothers wait), sau đó lấp đầy các worker
+            limit = 1 if results[0] is None else workers
+            while pending and len(running) < limit:
+                i, move = pending.pop(0)
+                remaining = None
+                if time_budget is not None and not (partial and i == 0):
+                    remaining = max(0.0, time_budget - (time.perf_counter() - start))
+                future = executor.submit(_search_child, data, move, depth, ai_color, alpha, remaining,
+                                         game=_GAME)
+                running[future] = i
+            # chờ có kết quả, định kỳ xem controller có yêu cầu dừng không
+            done, _ = wait(running, timeout=0.05, return_when=FIRST_COMPLETED)
+            if stop is not None and stop.is_set():
+                for other in running:
+                    other.cancel()
+                return None
+            timed_out = False
+            for future in done:
+                i = running.pop(future)
+                value = future.result()
+                if value is None:
+                    timed_out = True
+                    continue
+                results[i] = value
+                alpha = max(alpha, value)
+            if timed_out:
+                for other in running:
+                    other.cancel()
+                break
+
+    if stop is not None and stop.is_set():
+        return None
+    finished = [i for i in range(len(moves)) if results[i] is not None]
+    if not finished or (len(finished) < len(moves) and not partial):
+        return None
+    best_index = max(finished, key=lambda i: (results[i], -i))
+    return results[best_index], moves[best_index]
+
+
+def iterative_deepening(board: Board, ai_color: int, time_budget: float = TIME_BUDGET,
+                        max_depth: int = MAX_DEPTH, tt: TranspositionTable = None,
+                        workers: int = 1, stop=None, stats: SearchStats = None):
+    """
+    Tìm kiếm sâu dần 1, 2, ... cho tới khi hết thời gian hoặc đạt max_depth.
+    Hạn chót áp dụng cho mọi vòng, kể cả vòng 1 ngay khi nước đầu ở gốc đã tìm xong
+    (hết giờ thì dùng nước tốt nhất đã tìm xong của vòng 1); vòng sau bị cắt giữa
+    chừng thì bị bỏ, trả về (value, move, depth) của vòng sâu nhất đã hoàn thành.
+    time_budget=None: không giới hạn thời gian, tìm đủ max_depth.
+    workers > 1 thì mỗi vòng chia nước ở gốc cho các tiến trình worker.
+    stats: SearchStats nhận số liệu của lượt tìm kiếm (chỉ đếm ở tiến trình này).
+    """
+    start = time.perf_counter()
+    ctx = SearchContext(stop=stop)
+    if stats is not None:
+        ctx.stats = stats
+    tt_probes, tt_hits = (tt.probes, tt.hits) if tt is not None else (0, 0)
+    work = board.copy()
+    ctx.attach_life(work)
+    best = (heuristic(board, ai_color, ctx.life), None, 0)
+
+    for depth in range(1, max_depth + 1):
+        if stop is not None and stop.is_set():
+            break
+        ctx.root_depth = depth
+        # vòng 1 chỉ bị cắt sau khi đã có một nước dự phòng ở gốc; các vòng sau có kết quả vòng trước
+        ctx.root_best = best[:2] if depth > 1 else None
+        ctx.deadline = start + time_budget if time_budget is not None else None
+        if workers > 1:
+            remaining = time_budget - (time.perf_counter() - start) if time_budget is not None else None
+            result = search_root_moves(work, ai_color, depth, workers, ctx.root_move, remaining,
+                                       stop=stop, partial=depth == 1)
+            if result is None:
+                break
+            value, move = result
+        else:
+            try:
+                value, move = minimax(work, depth, True, ai_color, tt=tt, ctx=ctx)
+            except SearchTimeout:
+                while work.undo_stack:
+                    work.undo()
+                if depth == 1 and ctx.root_best is not None and not (stop is not None and stop.is_set()):
+                    best = (*ctx.root_best, 0)
                 break
-        return best_value, best_move
+        best = (value, move, depth)
+        ctx.root_move = move
+        if move is None:
+            break
+        # vòng sau thường tốn gấp nhiều lần vòng trước: không bắt đầu nếu khó kịp
+        elapsed = time.perf_counter() - start
+        if time_budget is not None and elapsed > time_budget / 2:
+            break
+    stats = ctx.stats
+    stats.depth = best[2]
+    stats.seldepth = max(stats.seldepth, best[2])
+    stats.nodes = ctx.nodes
+    if tt is not None:
+        stats.tt_probes = tt.probes - tt_probes
+        stats.tt_hits = tt.hits - tt_hits
+    stats.seconds = time.perf_counter() - start
+    return best
 
 
-def choose_ai_move(board: Board, ai_color: int):
+def choose_ai_move(board: Board, ai_color: int, tt: TranspositionTable = None,
+                   time_budget: float = TIME_BUDGET, max_depth: int = MAX_DEPTH,
+                   workers: int = 1, stop=None, stats: SearchStats = None):
     # ====== THÊM ĐIỀU KIỆN PASS THÔNG MINH ======
-    total_empty = sum(1 for i in range(9) for j in range(9) if board.grid[i][j] == 0)
-    
-    # Nếu còn ít hơn 12 ô trống → 99% là endgame → nên pass nếu đang dẫn trước
-    if total_empty <= 12:
-        current_heuristic = heuristic(board, ai_color)
+    total_empty = sum(1 for row in board.grid for cell in row if cell == 0)
+    # Nếu còn ít hơn 12 ô trống → 99% là endgame → nên pass nếu đang dẫn trước,
+    # nhưng chỉ khi bản đồ ảnh hưởng cũng cho thấy gần như mọi ô trống đã ngã ngũ
+    if total_empty <= 12 and board.contested_points() <= 4:
+        current_heuristic = heuristic(board, ai_color, unconditional_life(board))
         # Nếu AI đang dẫn trước ít nhất 8 điểm → pass luôn cho an toàn
         if current_heuristic > 8:
             return None  # PASS NGAY
@@ -65,6 +481,9 @@ def choose_ai_move(board: Board, ai_color: int):
     if total_empty <= 8:
         return None  # PASS LUÔN
 
-    # ====== BÌNH THƯỜNG: dùng Minimax ======
-    _, move = minimax(board, MAX_DEPTH, True, ai_color)
+    # ====== BÌNH THƯỜNG: Minimax sâu dần trong giới hạn thời gian ======
+    if tt is not None:
+        tt.new_search()
+    _, move, _ = iterative_deepening(board, ai_color, time_budget, max_depth, tt, workers, stop,
+                                     stats)
     return move
\ No newline at end of file
@@ -0,0 +1,131 @@
+# ai/Patterns.py
+
+import os
+import zlib
+from array import array
+from typing import List, Tuple
+from models.Board import Board, PATTERN_DIRS, OFF_BOARD
+from models.GameState import BLACK
+
+# Bảng ưu tiên theo mã mẫu 3x3 (Board.pattern_code), tính cho bên đen đi;
+# bên trắng tra bằng mã đã đổi màu (swap_colors). Lưu dạng int8 nén zlib.
+PATTERN_FILE = os.path.join(os.path.dirname(__file__), "data", "patterns3x3.bin")
+PATTERN_COUNT = 1 << (2 * len(PATTERN_DIRS))
+EMPTY_FIELD, OWN_FIELD, ENEMY_FIELD = 0, 1, 2   # giá trị trường 2 bit khi nhìn từ bên đen
+
+PRUNE_BELOW = -20   # nước có điểm mẫu thấp hơn ngưỡng này bị loại khỏi tìm kiếm
+EYE_FILL = -100     # tự lấp mắt của mình
+EMPTY_EDGE = -30    # đi ở tuyến 1 khi quanh đó chưa có quân nào
+
+_ORTHOGONAL = [k for k, (dx, dy) in enumerate(PATTERN_DIRS) if dx == 0 or dy == 0]
+_DIAGONAL = [k for k, (dx, dy) in enumerate(PATTERN_DIRS) if dx != 0 and dy != 0]
+# với mỗi góc chéo: hai ô thẳng kề nó (dùng cho hane / điểm cắt)
+_CORNER_SIDES = {
+    k: tuple(PATTERN_DIRS.index(side) for side in ((dx, 0), (0, dy)))
+    for k, (dx, dy) in enumerate(PATTERN_DIRS) if dx != 0 and dy != 0
+}
+
+_DEFAULT = None
+
+
+def swap_colors(code: int) -> int:
+    """Đổi đen <-> trắng trong mã mẫu (trường 01 <-> 10, giữ nguyên 00 và 11)."""
+    differ = (code ^ (code >> 1)) & 0x5555
+    return code ^ (differ * 3)
+
+
+def score_pattern(code: int) -> int:
+    """Điểm ưu tiên của một mẫu cho bên đen đi vào điểm giữa (luật viết tay, kẹp trong int8)."""
+    fields = [(code >> (2 * k)) & 3 for k in range(len(PATTERN_DIRS))]
+    own, enemy = OWN_FIELD, ENEMY_FIELD
+    orth = [fields[k] for k in _ORTHOGONAL]
+    diag = [fields[k] for k in _DIAGONAL]
+    off_orth = orth.count(OFF_BOARD)
+    own_orth, enemy_orth = orth.count(own), orth.count(enemy)
+    own_diag, enemy_diag = diag.count(own), diag.count(enemy)
+
+    # Mắt của mình: mọi điểm kề thẳng là quân mình, đối thủ giữ không quá 1 góc chéo
+    if own_orth + off_orth == 4 and enemy_diag + (1 if off_orth else 0) < 2:
+        return EYE_FILL
+    if own_orth + enemy_orth + own_diag + enemy_diag == 0:
+        return EMPTY_EDGE if off_orth else 0
+
+    score = 6 * enemy_orth + 3 * own_orth + 2 * (own_diag + enemy_diag)
+    for k, (a, b) in _CORNER_SIDES.items():
+        side_a, side_b, corner = fields[a], fields[b], fields[k]
+        if side_a == enemy and side_b == enemy and corner != enemy:
+            score += 15   # điểm cắt giữa hai quân đối thủ
+        elif corner == own and enemy in (side_a, side_b) and EMPTY_FIELD in (side_a, side_b):
+            score += 10   # hane: chặn đầu quân đối thủ từ quân mình ở góc chéo
+    if own_orth >= 3 and enemy_orth == 0:
+        score -= 10       # tự bóp khí (tam giác rỗng, lấp khí của mình)
+    if off_orth and own_orth + enemy_orth == 0:
+        score -= 10       # tuyến 1 chỉ chạm quân ở góc chéo
+    return max(-128, min(127, score))
+
+
+class PatternTable:
+    """
+    Bảng ưu tiên 65536 mục (int8) theo mã mẫu 3x3, dùng để sắp thứ tự nước đi
+    và loại các nước rõ ràng dở (lấp mắt mình, tuyến 1 xa quân).
+    """
+
+    def __init__(self, priors: array):
+        self.priors = priors
+
+    @classmethod
+    def build(cls) -> "PatternTable":
+        return cls(array("b", (score_pattern(code) for code in range(PATTERN_COUNT))))
+
+    @classmethod
+    def load(cls, path: str = PATTERN_FILE) -> "PatternTable":
+        priors = array("b")
+        with open(path, "rb") as f:
+            priors.frombytes(zlib.decompress(f.read()))
+        if len(priors) != PATTERN_COUNT:
+            raise ValueError(f"Bảng mẫu hỏng: {path}")
+        return cls(priors)
+
+    def save(self, path: str = PATTERN_FILE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(zlib.compress(self.priors.tobytes(), 9))
+
+    def prior(self, board: Board, x: int, y: int, color: int) -> int:
+        code = board.pattern_code(x, y)
+        return self.priors[code if color == BLACK else swap_colors(code)]
+
+    def candidates(self, board: Board, moves: List[Tuple[int, int]], color: int,
+                   keep=None) -> List[Tuple[int, int]]:
+        """
+        Bỏ các nước có điểm dưới PRUNE_BELOW (trừ keep, ví dụ nước của bảng chuyển vị)
+        rồi xếp theo điểm giảm dần; nếu mọi nước đều bị loại thì giữ nguyên danh sách.
+        """
+        priors = self.priors
+        scored = []
+        for move in moves:
+            code = board.pattern_code(move[0], move[1])
+            score = priors[code if color == BLACK else swap_colors(code)]
+            if score >= PRUNE_BELOW or move == keep:
+                scored.append((-score, move))
+        if not scored:
+            return moves
+        scored.sort()
+        return [move for _, move in scored]
+
+
+def default_table() -> PatternTable:
+    """Bảng dùng chung của tiến trình: nạp từ PATTERN_FILE, thiếu file thì dựng lại trong bộ nhớ."""
+    global _DEFAULT
+    if _DEFAULT is None:
+        try:
+            _DEFAULT = PatternTable.load()
+        except (OSError, ValueError, zlib.error):
+            _DEFAULT = PatternTable.build()
+    return _DEFAULT
+
+
+if __name__ == "__main__":
+    # Sinh lại file bảng mẫu: chạy `python -m ai.Patterns` trong thư mục src
+    PatternTable.build().save()
+    print(f"Đã ghi {PATTERN_FILE}")
@@ -0,0 +1,81 @@
+# ai/SearchStats.py
+
+from dataclasses import dataclass, field, asdict
+from typing import List
+
+CUTOFF_BUCKETS = 8   # cắt tỉa ở nước thứ 0..6, ô cuối gộp mọi chỉ số >= 7
+
+
+@dataclass(slots=True)
+class SearchStats:
+    """
+    Số liệu của một lượt tìm kiếm (một nước đi). Chỉ đếm ở tiến trình gọi:
+    với workers > 1, nút của các worker không được cộng vào.
+    Thời gian chia làm sinh nước (legal_moves, lọc, sắp thứ tự, tactical_moves),
+    chấm điểm (heuristic) và phần còn lại (duyệt cây, play/undo, bảng chuyển vị).
+    """
+    engine: str = "minimax"
+    depth: int = 0              # độ sâu của vòng iterative deepening sâu nhất đã xong
+    seldepth: int = 0           # ply sâu nhất từng chạm tới, kể cả quiescence
+    nodes: int = 0              # mọi nút (minimax + quiescence); MCTS: số playout
+    qnodes: int = 0             # nút quiescence
+    evals: int = 0              # số lần chấm lá
+    cutoffs: int = 0            # số lần cắt alpha-beta trong minimax
+    cutoff_index: List[int] = field(default_factory=lambda: [0] * CUTOFF_BUCKETS)
+    tt_probes: int = 0
+    tt_hits: int = 0
+    seconds: float = 0.0
+    movegen_seconds: float = 0.0
+    eval_seconds: float = 0.0
+
+    def record_cutoff(self, index: int):
+        """index: vị trí (tính từ 0) của nước gây cắt trong danh sách đã sắp."""
+        self.cutoffs += 1
+        self.cutoff_index[min(index, CUTOFF_BUCKETS - 1)] += 1
+
+    @property
+    def search_seconds(self) -> float:
+        return max(0.0, self.seconds - self.movegen_seconds - self.eval_seconds)
+
+    @property
+    def tt_hit_rate(self) -> float:
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    @property
+    def first_move_cutoff_rate(self) -> float:
+        """Tỉ lệ cắt ở ngay nước đầu: thước đo chất lượng sắp thứ tự nước đi."""
+        return self.cutoff_index[0] / self.cutoffs if self.cutoffs else 0.0
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.seconds if self.seconds > 0 else 0.0
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        data.update(
+            search_seconds=self.search_seconds,
+            tt_hit_rate=self.tt_hit_rate,
+            first_move_cutoff_rate=self.first_move_cutoff_rate,
+            nodes_per_second=self.nodes_per_second,
+        )
+        return data
+
+    def summary_lines(self) -> List[str]:
+        """Các dòng ngắn cho bảng debug của GameUI."""
+        if self.engine == "mcts":
+            return [
+                "engine: mcts",
+                f"playouts: {self.nodes}  ({self.nodes_per_second:.0f}/s)",
+                f"time: {self.seconds:.2f}s",
+            ]
+        return [
+            f"depth: {self.depth}  seldepth: {self.seldepth}",
+            f"nodes: {self.nodes}  q: {self.qnodes}  ({self.nodes_per_second:.0f}/s)",
+            f"evals: {self.evals}",
+            f"cutoffs: {self.cutoffs}  first: {self.first_move_cutoff_rate:.0%}",
+            "cut idx: " + " ".join(str(n) for n in self.cutoff_index),
+            f"TT: {self.tt_hits}/{self.tt_probes} ({self.tt_hit_rate:.0%})",
+            f"time: {self.seconds:.2f}s",
+            f"  movegen {self.movegen_seconds:.2f}  eval {self.eval_seconds:.2f}"
+            f"  search {self.search_seconds:.2f}",
+        ]
@@ -0,0 +1,87 @@
+# ai/Tactics.py
+
+from typing import List, Tuple
+from models.Board import Board
+from models.GameState import EMPTY
+
+LADDER_DEPTH = 40  # trần số nước của một lần đọc thang (mỗi bên ~20 nước)
+
+
+def ladder_captured(board: Board, x: int, y: int, budget: int = LADDER_DEPTH) -> bool:
+    """
+    Đọc thang cho chuỗi đang bị atari chứa (x, y), bên chạy đi trước.
+    Chỉ đi theo các nước 1 khí (chạy ra khí cuối / bên tấn công atari tiếp)
+    bằng play()/undo(), không dùng bộ sinh nước đầy đủ.
+    Trả về True nếu chuỗi chắc chắn bị bắt.
+    """
+    color = board.grid[x][y]
+    stones, liberties = board.get_group_and_liberties(x, y)
+    if color == EMPTY or len(liberties) != 1:
+        return False
+    if budget <= 0:
+        return False  # đọc quá sâu: coi như thoát được
+
+    # Bên chạy bắt được quân tấn công đang bị atari → thoát thang
+    for sx, sy in stones:
+        for nx, ny in board.neighbors(sx, sy):
+            if board.grid[nx][ny] == -color \
+                    and len(board.get_group_and_liberties(nx, ny)[1]) == 1:
+                return False
+
+    (ex, ey), = liberties
+    if not board.play(ex, ey, color):
+        return True
+    try:
+        libs = board.get_group_and_liberties(ex, ey)[1]
+        if len(libs) <= 1:
+            return True
+        if len(libs) >= 3:
+            return False
+        # Còn 2 khí: bên tấn công thử atari ở từng khí, thang thành công nếu một cách bắt được
+        for ax, ay in list(libs):
+            if not board.play(ax, ay, -color):
+                continue
+            try:
+                # quân atari của bên tấn công không được tự rơi vào atari
+                if len(board.get_group_and_liberties(ax, ay)[1]) >= 2 \
+                        and ladder_captured(board, ex, ey, budget - 2):
+                    return True
+            finally:
+                board.undo()
+        return False
+    finally:
+        board.undo()
+
+
+def tactical_moves(board: Board, color: int, exclude=()) -> List[Tuple[int, int]]:
+    """
+    Nước chiến thuật cho quiescence của bên color:
+    - bắt chuỗi đối thủ đang bị atari,
+    - chạy chuỗi của mình đang bị atari (trừ khi chạy vẫn chết trong thang),
+    - atari chuỗi đối thủ 2 khí khi thang sau đó bắt được.
+    exclude: các điểm bỏ qua (vùng đã ngã ngũ theo Benson).
+    """
+    captures = []
+    escapes = []
+    ataris = []
+    for chain_color, stones, libs in board.iter_chains():
+        if chain_color == -color:
+            if len(libs) == 1:
+                captures.extend(libs)
+            elif len(libs) == 2:
+                sx, sy = next(iter(stones))
+                for ax, ay in list(libs):
+                    if board.play(ax, ay, color):
+                        if ladder_captured(board, sx, sy):
+                            ataris.append((ax, ay))
+                        board.undo()
+        elif len(libs) == 1:
+            sx, sy = next(iter(stones))
+            if not ladder_captured(board, sx, sy):
+                escapes.extend(libs)
+
+    moves = []
+    for move in captures + escapes + ataris:
+        if move not in moves and move not in exclude and board.is_legal(move[0], move[1], color):
+            moves.append(move)
+    return moves
@@ -0,0 +1,57 @@
+# ai/TranspositionTable.py
+
+from typing import Optional, Tuple
+
+# Loại giá trị lưu trong bảng
+EXACT = 0   # giá trị chính xác
+LOWER = 1   # cận dưới (đã cắt beta, giá trị thật >= value)
+UPPER = 2   # cận trên (không vượt được alpha, giá trị thật <= value)
+
+
+class TranspositionTable:
+    """
+    Bảng chuyển vị kích thước cố định, khóa bằng Board.hash.
+    Mỗi bucket có 2 ô: ô ưu tiên độ sâu (chỉ bị thay bởi kết quả sâu hơn
+    hoặc kết quả của lượt tìm kiếm mới) và ô luôn thay thế.
+    Mỗi mục là tuple (key, depth, value, flag, move, generation).
+    """
+
+    def __init__(self, size_bits: int = 16):
+        self.mask = (1 << size_bits) - 1
+        self.slots = [None] * (2 << size_bits)
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+
+    def new_search(self):
+        """Gọi đầu mỗi nước đi: mục của các lượt trước trở nên dễ bị thay thế."""
+        self.generation += 1
+
+    def clear(self):
+        self.slots = [None] * len(self.slots)
+        self.generation = 0
+
+    def probe(self, key: int) -> Optional[Tuple]:
+        self.probes += 1
+        i = (key & self.mask) << 1
+        for entry in (self.slots[i], self.slots[i + 1]):
+            if entry is not None and entry[0] == key:
+                self.hits += 1
+                return entry
+        return None
+
+    def store(self, key: int, depth: int, value: float, flag: int, move):
+        i = (key & self.mask) << 1
+        entry = (key, depth, value, flag, move, self.generation)
+        deep = self.slots[i]
+        if (
+            deep is None
+            or depth >= deep[1]
+            or deep[5] != self.generation
+        ):
+            # đẩy mục cũ của ô ưu tiên độ sâu xuống ô luôn thay thế
+            if deep is not None and deep[0] != key:
+                self.slots[i + 1] = deep
+            self.slots[i] = entry
+        else:
+            self.slots[i + 1] = entry
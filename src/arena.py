@@ -0,0 +1,246 @@
+# arena.py
+#
+# Đấu AI với AI không cần cửa sổ Pygame, chạy nhiều ván song song trên pool tiến trình.
+# Ví dụ (chạy trong thư mục src):
+#   python arena.py --games 20 --workers 4 \
+#       --engine name=base,depth=3,time=none \
+#       --engine name=terr,depth=3,time=none,w.territory=13
+
+import argparse
+import itertools
+import json
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional
+from ai import Heuristic
+from ai.Minimax import MAX_DEPTH
+from models.Board import Board
+from models.GameState import GameState, BLACK, WHITE
+from players.AIPlayer import AIPlayer
+
+MAX_MOVES = 200        # trần số nước mỗi ván (kể cả pass), quá thì chấm điểm luôn
+OPENING_MOVES = 2      # số nước ngẫu nhiên đầu ván để các ván không giống hệt nhau
+DEFAULT_WEIGHTS = dict(Heuristic.WEIGHTS)
+
+
+@dataclass
+class EngineConfig:
+    """Một cấu hình AI tham gia arena."""
+    name: str
+    engine: str = "minimax"
+    time_budget: Optional[float] = 0.5   # None: tìm đủ max_depth
+    max_depth: int = MAX_DEPTH
+    weights: Dict[str, float] = field(default_factory=dict)  # ghi đè Heuristic.WEIGHTS
+
+    @classmethod
+    def parse(cls, spec: str) -> "EngineConfig":
+        """Đọc chuỗi dạng "name=a,depth=3,time=0.5,engine=mcts,w.stone=12"."""
+        values = dict(item.split("=", 1) for item in spec.split(",") if item)
+        config = cls(values.pop("name", spec))
+        for key, value in values.items():
+            if key.startswith("w."):
+                if key[2:] not in DEFAULT_WEIGHTS:
+                    raise ValueError(f"Unknown heuristic weight: {key[2:]}")
+                config.weights[key[2:]] = float(value)
+            elif key == "time":
+                config.time_budget = None if value == "none" else float(value)
+            elif key == "depth":
+                config.max_depth = int(value)
+            elif key == "engine":
+                config.engine = value
+            else:
+                raise ValueError(f"Unknown engine option: {key}")
+        if config.engine == "mcts" and config.time_budget is None:
+            raise ValueError("mcts needs a time budget")
+        return config
+
+
+# ----------------- một ván (chạy trong tiến trình worker) -----------------
+
+def play_game(black: EngineConfig, white: EngineConfig, seed: int,
+              opening_moves: int = OPENING_MOVES, max_moves: int = MAX_MOVES) -> dict:
+    """
+    Chơi một ván black vs white. Mỗi bên có bàn cờ riêng,
+    nước đi được áp dụng lên cả hai. Trả về dict kết quả + độ trễ / số nút theo từng bên.
+    """
+    rng = random.Random(seed)
+    configs = {BLACK: black, WHITE: white}
+    states = {color: GameState(board=Board()) for color in configs}
+    players = {
+        color: AIPlayer(color, c.name, c.time_budget, engine=c.engine, max_depth=c.max_depth)
+        for color, c in configs.items()
+    }
+    for color, player in players.items():
+        if player.mcts is not None:
+            player.mcts.rng.seed(seed + color)
+    latencies = {BLACK: [], WHITE: []}
+    nodes = {BLACK: 0, WHITE: 0}
+    search_seconds = {BLACK: 0.0, WHITE: 0.0}
+    color = BLACK
+    passes = 0
+    moves = 0
+
+    while passes < 2 and moves < max_moves:
+        board = states[color].board
+        if moves < opening_moves:
+            move = rng.choice(board.legal_moves(color))
+        else:
+            # trọng số heuristic là biến toàn cục của tiến trình: đặt lại trước mỗi nước
+            Heuristic.WEIGHTS.update(DEFAULT_WEIGHTS, **configs[color].weights)
+            player = players[color]
+            started = time.perf_counter()
+            move = player.choose_move(states[color])
+            elapsed = time.perf_counter() - started
+            latencies[color].append(elapsed)
+            nodes[color] += player.stats.nodes
+            search_seconds[color] += player.stats.seconds or elapsed
+        if move is None:
+            passes += 1
+            for state in states.values():
+                state.pass_move()
+        else:
+            passes = 0
+            for state in states.values():
+                if not state.board.apply_move(move[0], move[1], color):
+                    raise RuntimeError(f"{configs[color].name} played an illegal move {move}")
+                state.place_stone()
+                state.switch_player()
+        color = -color
+        moves += 1
+
+    black_score, white_score = states[BLACK].board.final_score()
+    Heuristic.WEIGHTS.update(DEFAULT_WEIGHTS)
+    return {
+        "black": black.name,
+        "white": white.name,
+        "seed": seed,
+        "moves": moves,
+        "black_score": black_score,
+        "white_score": white_score,
+        "winner": black.name if black_score > white_score else white.name,
+        "latencies": {black.name: latencies[BLACK], white.name: latencies[WHITE]},
+        "nodes": {black.name: nodes[BLACK], white.name: nodes[WHITE]},
+        "search_seconds": {black.name: search_seconds[BLACK], white.name: search_seconds[WHITE]},
+    }
+
+
+# ----------------- tổng hợp -----------------
+
+def elo_ratings(names: List[str], games: List[dict], iterations: int = 500) -> Dict[str, float]:
+    """
+    Ước lượng Elo bằng cách lặp cập nhật tới khi số ván thắng kỳ vọng khớp thực tế.
+    Mỗi bên có thêm một ván hòa ảo với đối thủ 0 điểm để tránh vô cực khi thắng trắng.
+    Engine đầu tiên được neo ở 0.
+    """
+    ratings = {name: 0.0 for name in names}
+    played = {name: 0 for name in names}
+    wins = {name: 0.5 for name in names}
+    for game in games:
+        played[game["black"]] += 1
+        played[game["white"]] += 1
+        wins[game["winner"]] += 1
+    for _ in range(iterations):
+        for name in names:
+            if not played[name]:
+                continue
+            expected = 1 / (1 + 10 ** (-ratings[name] / 400))   # ván hòa ảo
+            for game in games:
+                if name in (game["black"], game["white"]):
+                    other = game["white"] if game["black"] == name else game["black"]
+                    expected += 1 / (1 + 10 ** ((ratings[other] - ratings[name]) / 400))
+            ratings[name] += 400 * (wins[name] - expected) / (played[name] + 1)
+    anchor = ratings[names[0]]
+    return {name: ratings[name] - anchor for name in names}
+
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p / 100
+    low, high = math.floor(k), math.ceil(k)
+    return ordered[low] + (ordered[high] - ordered[low]) * (k - low)
+
+
+def summarize(configs: List[EngineConfig], games: List[dict]) -> Dict[str, dict]:
+    names = [c.name for c in configs]
+    elo = elo_ratings(names, games)
+    summary = {}
+    for name in names:
+        mine = [g for g in games if name in (g["black"], g["white"])]
+        latencies = [t for g in mine for t in g["latencies"][name]]
+        nodes = sum(g["nodes"][name] for g in mine)
+        seconds = sum(g["search_seconds"][name] for g in mine)
+        summary[name] = {
+            "games": len(mine),
+            "wins": sum(1 for g in mine if g["winner"] == name),
+            "elo": round(elo[name], 1),
+            "moves": len(latencies),
+            "latency_p50": percentile(latencies, 50),
+            "latency_p90": percentile(latencies, 90),
+            "latency_p99": percentile(latencies, 99),
+            "latency_max": max(latencies, default=0.0),
+            "nodes": nodes,
+            "nodes_per_second": nodes / seconds if seconds > 0 else 0.0,
+        }
+    return summary
+
+
+def run_arena(configs: List[EngineConfig], games_per_pair: int, workers: int = 1,
+              opening_moves: int = OPENING_MOVES, max_moves: int = MAX_MOVES,
+              seed: int = 0) -> List[dict]:
+    """Đấu vòng tròn mọi cặp cấu hình, đổi màu sau mỗi ván; các ván chạy song song."""
+    jobs = []
+    for a, b in itertools.combinations(configs, 2):
+        for i in range(games_per_pair):
+            black, white = (a, b) if i % 2 == 0 else (b, a)
+            jobs.append((black, white, seed + len(jobs), opening_moves, max_moves))
+    if workers <= 1:
+        return [play_game(*job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(play_game, *job) for job in jobs]
+        return [future.result() for future in futures]
+
+
+def print_summary(summary: Dict[str, dict], elapsed: float):
+    print(f"{'engine':<16}{'games':>6}{'wins':>6}{'elo':>8}{'p50 ms':>9}{'p90 ms':>9}"
+          f"{'p99 ms':>9}{'nodes/s':>10}")
+    for name, s in summary.items():
+        print(f"{name:<16}{s['games']:>6}{s['wins']:>6}{s['elo']:>8.1f}"
+              f"{s['latency_p50'] * 1000:>9.1f}{s['latency_p90'] * 1000:>9.1f}"
+              f"{s['latency_p99'] * 1000:>9.1f}{s['nodes_per_second']:>10.0f}")
+    print(f"wall time: {elapsed:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless AI-vs-AI arena")
+    parser.add_argument("--engine", action="append", required=True,
+                        help="engine spec, e.g. name=a,depth=3,time=0.5,w.stone=12")
+    parser.add_argument("--games", type=int, default=10, help="games per pair of engines")
+    parser.add_argument("--workers", type=int, default=1, help="games played in parallel")
+    parser.add_argument("--opening", type=int, default=OPENING_MOVES, help="random opening moves")
+    parser.add_argument("--max-moves", type=int, default=MAX_MOVES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write per-game records and summary to this file")
+    args = parser.parse_args()
+
+    configs = [EngineConfig.parse(spec) for spec in args.engine]
+    if len(configs) < 2 or len({c.name for c in configs}) != len(configs):
+        parser.error("need at least two engines with distinct names")
+
+    start = time.perf_counter()
+    games = run_arena(configs, args.games, args.workers, args.opening, args.max_moves, args.seed)
+    elapsed = time.perf_counter() - start
+    summary = summarize(configs, games)
+    print_summary(summary, elapsed)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"engines": [asdict(c) for c in configs], "summary": summary,
+                       "games": games}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+# bench.py
+#
+# Bộ benchmark cho các thao tác của Board và cho tìm kiếm, chạy trên bộ thế cờ cố định
+# (benchmarks/corpus.txt). In kết quả dạng JSON và so với baseline đã lưu.
+# Ví dụ (chạy trong thư mục src):
+#   python bench.py --backend list --baseline ../benchmarks/baseline_list.json
+#   python bench.py --backend flat --save-baseline ../benchmarks/baseline_flat.json
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+from ai import BatchEval, Benson
+from ai.Heuristic import heuristic
+from ai.Minimax import choose_ai_move
+from ai.SearchStats import SearchStats
+from ai.TranspositionTable import TranspositionTable
+from models.FlatBoard import BOARD_BACKENDS
+from models.GameState import GameState, BLACK, WHITE, EMPTY
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks")
+CORPUS_FILE = os.path.join(BENCH_DIR, "corpus.txt")
+# chậm hơn baseline quá 35% thì coi là hồi quy: dù đã chia theo tốc độ hiệu chuẩn, trên máy một
+# nhân / CPU dùng chung các lần chạy liên tiếp vẫn lệch nhau tới ±30% (đo trên VM 1 nhân);
+# máy riêng ổn định thì truyền --threshold 0.15
+THRESHOLD = 0.35
+SEARCH_DEPTH = 2      # độ sâu cố định cho choose_ai_move
+REPEAT = 3            # chạy mỗi benchmark vài lần, lấy lần nhanh nhất
+CALIBRATION_OPS = 100_000   # số vòng của vòng lặp hiệu chuẩn (~30 ms)
+
+_CELLS = {".": EMPTY, "X": BLACK, "O": WHITE}
+_mem_base = 0          # bộ nhớ đang giữ lúc bắt đầu phần được đo (khi tracemalloc bật)
+
+
+# ----------------- bộ thế cờ -----------------
+
+def load_corpus(path: str = CORPUS_FILE) -> List[Tuple[str, str, int, List[List[int]]]]:
+    """Đọc danh sách (tên, giai đoạn, bên đi, lưới)."""
+    positions = []
+    with open(path) as f:
+        lines = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    i = 0
+    while i < len(lines):
+        name, phase, to_move = lines[i].split()
+        rows = lines[i + 1:i + 1 + len(lines[i + 1])]
+        grid = [[_CELLS[c] for c in row] for row in rows]
+        positions.append((name.strip("[]"), phase, BLACK if to_move == "black" else WHITE, grid))
+        i += 1 + len(rows)
+    return positions
+
+
+def make_state(backend: str, grid) -> GameState:
+    board = BOARD_BACKENDS[backend](len(grid))
+    board.load_grid(grid)
+    return GameState(board=board)
+
+
+def _start_clock() -> float:
+    """Bắt đầu phần được đo; đặt lại đỉnh tracemalloc để peak_bytes không tính phần chuẩn bị."""
+    global _mem_base
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+        _mem_base = tracemalloc.get_traced_memory()[0]
+    return time.perf_counter()
+
+
+# ----------------- các benchmark -----------------
+# Mỗi hàm nhận danh sách (state, bên đi), tự đo thời gian phần cần đo và trả về
+# (số thao tác, giây) hoặc (số thao tác, giây, số liệu thêm)
+
+def bench_apply_move(positions) -> Tuple[int, float]:
+    # bản sao chuẩn bị trước, chỉ đo apply_move
+    jobs = []
+    for state, color in positions:
+        for move in state.board.legal_moves(color):
+            jobs.extend((state.board.copy(), move, color) for _ in range(10))
+    start = _start_clock()
+    for board, (x, y), color in jobs:
+        board.apply_move(x, y, color)
+    return len(jobs), time.perf_counter() - start
+
+
+def bench_legal_moves(positions) -> Tuple[int, float]:
+    # mẫu dùng trong tìm kiếm: đi một nước rồi hỏi nước hợp lệ của bên kia
+    ops = 0
+    elapsed = 0.0
+    for state, color in positions:
+        board = state.board
+        for x, y in board.legal_moves(color)[:20]:
+            if not board.play(x, y, color):
+                continue
+            start = _start_clock()
+            board.legal_moves(-color)
+            elapsed += time.perf_counter() - start
+            board.undo()
+            ops += 1
+    return ops, elapsed
+
+
+def bench_group_lookup(positions) -> Tuple[int, float]:
+    jobs = [
+        (state.board, x, y)
+        for state, _ in positions
+        for x in range(state.board.size)
+        for y in range(state.board.size)
+        if state.board.grid[x][y] != EMPTY
+    ]
+    start = _start_clock()
+    for _ in range(20):
+        for board, x, y in jobs:
+            board.get_group_and_liberties(x, y)
+    return 20 * len(jobs), time.perf_counter() - start
+
+
+def bench_estimate_territory(positions) -> Tuple[int, float]:
+    start = _start_clock()
+    for _ in range(50):
+        for state, _ in positions:
+            state.board.estimate_territory()
+    return 50 * len(positions), time.perf_counter() - start
+
+
+def bench_heuristic(positions) -> Tuple[int, float]:
+    start = _start_clock()
+    for _ in range(50):
+        for state, color in positions:
+            heuristic(state.board, color)
+    return 50 * len(positions), time.perf_counter() - start
+
+
+def bench_heuristic_batch(positions) -> Tuple[int, float]:
+    # cùng số thế cờ như bench_heuristic nhưng chấm một lần qua BatchEval (kể cả chép lưới)
+    start = _start_clock()
+    for color in (BLACK, WHITE):
+        snapshots = [BatchEval.collect(state.board) for _ in range(25) for state, _ in positions]
+        BatchEval.evaluate_batch(snapshots, color)
+    return 50 * len(positions), time.perf_counter() - start
+
+
+def bench_search(positions) -> Tuple[int, float, dict]:
+    # mỗi thế cờ một bảng chuyển vị mới; số nút lấy từ SearchStats
+    nodes = 0
+    start = _start_clock()
+    for state, color in positions:
+        stats = SearchStats()
+        choose_ai_move(state.board, color, TranspositionTable(), time_budget=None,
+                       max_depth=SEARCH_DEPTH, stats=stats)
+        nodes += stats.nodes
+    return len(positions), time.perf_counter() - start, {"nodes": nodes}
+
+
+BENCHMARKS: Dict[str, Callable] = {
+    "apply_move": bench_apply_move,
+    "legal_moves": bench_legal_moves,
+    "get_group_and_liberties": bench_group_lookup,
+    "estimate_territory": bench_estimate_territory,
+    "heuristic": bench_heuristic,
+    f"choose_ai_move_d{SEARCH_DEPTH}": bench_search,
+}
+if BatchEval.available():
+    BENCHMARKS["heuristic_batch"] = bench_heuristic_batch
+
+
+# ----------------- hiệu chuẩn -----------------
+
+def _calibration_step(points, seen, counts, i):
+    p = points[i % 81]
+    seen.add(p)
+    counts[p] = counts.get(p, 0) + 1
+    return p[0] + p[1]
+
+
+def calibrate() -> float:
+    """
+    Tốc độ (vòng/giây) của một vòng lặp Python thuần cố định: tuple, set, dict, list, gọi hàm,
+    cùng kiểu thao tác với code bàn cờ. Đo ngay trước mỗi lần chạy benchmark nên máy chạy
+    nhanh / chậm hơn (máy khác, CPU bị chia sẻ, đổi xung nhịp) ảnh hưởng cả hai như nhau.
+    """
+    points = [(x, y) for x in range(9) for y in range(9)]
+    seen, counts = set(), {}
+    total = 0
+    start = time.perf_counter()
+    for i in range(CALIBRATION_OPS):
+        total += _calibration_step(points, seen, counts, i)
+    return CALIBRATION_OPS / (time.perf_counter() - start)
+
+
+# ----------------- chạy + đo cấp phát -----------------
+
+def run_benchmark(fn, corpus, backend: str, repeat: int = REPEAT) -> dict:
+    """
+    ops_per_second: lần chạy nhanh nhất trong repeat lần (mỗi lần dựng lại thế cờ).
+    calibrated: ops_per_second chia cho tốc độ vòng lặp hiệu chuẩn đo ngay trước lần chạy đó
+    (số thao tác trên một triệu vòng hiệu chuẩn), lấy lần cao nhất; dùng để so với baseline.
+    retained_blocks_per_op: số khối bộ nhớ còn giữ lại sau cả lần chạy, chia cho số thao tác
+    (phát hiện rò / cache phình; CPython không đếm được số lần cấp phát của từng thao tác);
+    peak_bytes: đỉnh bộ nhớ cấp phát thêm trong phần được đo, đo ở một lần chạy riêng có tracemalloc.
+    """
+    def fresh():
+        Benson._CACHE.clear()   # mỗi lần chạy bắt đầu với cache rỗng để các lần đo so được với nhau
+        return [(make_state(backend, grid), color) for _, _, color, grid in corpus]
+
+    best = None
+    calibrated = 0.0
+    for _ in range(repeat):
+        positions = fresh()
+        speed = calibrate()
+        ops, seconds, *extra = fn(positions)
+        rate = ops / seconds if seconds > 0 else 0.0
+        calibrated = max(calibrated, rate / speed * 1e6)
+        if best is None or rate > best[1]:
+            best = (ops, rate, seconds, extra)
+    ops, rate, seconds, extra = best
+
+    # lần đo bộ nhớ chạy riêng: tracemalloc làm chậm đáng kể nên không tính vào thời gian
+    positions = fresh()
+    tracemalloc.start()
+    blocks = sys.getallocatedblocks()
+    fn(positions)
+    retained = sys.getallocatedblocks() - blocks
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    peak -= _mem_base
+    result = {
+        "ops": ops,
+        "ops_per_second": round(rate, 1),
+        "calibrated": round(calibrated, 3),
+        "retained_blocks_per_op": round(retained / ops, 3) if ops else 0.0,
+        "peak_bytes": peak,
+    }
+    if extra and "nodes" in extra[0]:
+        result["nodes_per_second"] = round(extra[0]["nodes"] / seconds, 1) if seconds > 0 else 0.0
+    return result
+
+
+def run_suite(backend: str, phases=None, repeat: int = REPEAT, only=None) -> dict:
+    corpus = [p for p in load_corpus() if phases is None or p[1] in phases]
+    results = {}
+    for name, fn in BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        results[name] = run_benchmark(fn, corpus, backend, repeat)
+    return {
+        "meta": {
+            "backend": backend,
+            "positions": len(corpus),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float = THRESHOLD) -> List[str]:
+    """
+    Danh sách benchmark chậm hơn baseline quá threshold. So trường calibrated (đã chia theo
+    tốc độ máy) nếu cả hai báo cáo có, để baseline lưu trên máy khác vẫn dùng được;
+    baseline cũ chưa có thì so thẳng ops_per_second.
+    """
+    regressions = []
+    for name, result in report["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            continue
+        field = "calibrated" if old.get("calibrated") and result.get("calibrated") else "ops_per_second"
+        if not old[field]:
+            continue
+        ratio = result[field] / old[field]
+        result["vs_baseline"] = round(ratio, 3)
+        if ratio < 1 - threshold:
+            regressions.append(f"{name}: {ratio:.2f}x baseline")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Board / search benchmarks")
+    parser.add_argument("--backend", choices=sorted(BOARD_BACKENDS), default="list")
+    parser.add_argument("--phase", action="append", choices=["opening", "middlegame", "endgame"])
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    parser.add_argument("--baseline", help="compare against this JSON report")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--save-baseline", help="write the report as the new baseline")
+    args = parser.parse_args()
+
+    report = run_suite(args.backend, args.phase, args.repeat, args.only)
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        report["regressions"] = regressions
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            f.write(text + "\n")
+    if regressions:
+        print("REGRESSION: " + "; ".join(regressions), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
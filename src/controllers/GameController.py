@@ -1,96 +1,145 @@
 # controllers/GameController.py
 
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import pygame
-from models.Board import Board
-from models.GameState import GameState, BOARD_SIZE, BLACK, WHITE
-from players.HumanPlayer import HumanPlayer
-from players.AIPlayer import AIPlayer
+from controllers.GameSession import GameSession
 from ui.GameUI import GameUI
 
+# sự kiện pygame do luồng AI gửi khi tìm xong, để vòng lặp chính thức dậy ngay
+AI_DONE_EVENT = pygame.USEREVENT + 1
+
+logger = logging.getLogger(__name__)
+
+
+def _session_attr(name: str):
+    # thuộc tính chỉ đọc lấy từ GameSession (GameUI đọc trạng thái ván qua controller)
+    return property(lambda self: getattr(self.session, name))
+
 
 class GameController:
-    def __init__(self, mode: str = "HUMAN_VS_AI"):
-        self.mode = mode  # "HUMAN_VS_AI" hoặc "HUMAN_VS_HUMAN"
+    """
+    Lớp Pygame bọc GameSession: nhận click / nút bấm, chạy AI trên luồng riêng
+    và giữ trạng thái vẽ (dirty, bảng debug). Luật chơi và tính điểm nằm trong GameSession.
+    """
+
+    board = _session_attr("board")
+    state = _session_attr("state")
+    captured_black = _session_attr("captured_black")
+    captured_white = _session_attr("captured_white")
+    game_over = _session_attr("game_over")
+    end_reason = _session_attr("end_reason")
+    result_text = _session_attr("result_text")
+    last_move = _session_attr("last_move")
+    black_player = _session_attr("black_player")
+    white_player = _session_attr("white_player")
+
+    def __init__(self, mode: str = "HUMAN_VS_AI", backend: str = "list", games_dir: str = None):
+        # AI suy nghĩ trên một luồng riêng; update() chỉ kiểm tra future mỗi frame
+        self.ai_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai")
+        self.ai_future = None
+        self.ai_stop = None
+        self.ai_started_at = 0.0
+        # SearchStats của nước AI gần nhất; show_debug bật bảng số liệu trên bàn cờ (phím D)
+        self.last_stats = None
+        self.show_debug = False
+        # trạng thái đổi từ lần vẽ trước → vòng lặp chính cần vẽ lại
+        self.dirty = True
+        # thư mục lưu biên bản SGF (main.py --save-games), None = không lưu;
+        # record_path: file SGF của ván vừa kết thúc
+        self.games_dir = games_dir
+        self.record_path = None
 
-        self.end_reason = ""
-        
-        # Vị trí nước đi cuối (row, col) hoặc None
-        self.last_move = None
         # khởi tạo game lần đầu
-        self.setup_new_game()
+        self.session = GameSession(mode, backend)
 
         # tạo UI sau khi có board/state
         self.ui = GameUI(self)
 
+    @property
+    def mode(self) -> str:
+        return self.session.mode
+
     # ----------------- tạo / reset game -----------------
 
     def setup_new_game(self):
-        self.board = Board()
-        self.state = GameState(board=self.board, current_player=BLACK)
-
-        if self.mode == "HUMAN_VS_HUMAN":
-            self.black_player = HumanPlayer(BLACK, "Black")
-            self.white_player = HumanPlayer(WHITE, "White")
-        else:
-            self.black_player = HumanPlayer(BLACK, "Human")
-            self.white_player = AIPlayer(WHITE, "Computer")
-
-        # captured
-        self.prev_black_stones, self.prev_white_stones = self.board.count_stones()
-        self.captured_black = 0
-        self.captured_white = 0
-
-        self.game_over = False
-        self.result_text = ""
-        self.last_move = None
+        self.cancel_ai_search()
+        self.session.new_game()
+        self.last_stats = None
+        self.record_path = None
+        self.dirty = True
 
     # ----------------- tiện ích -----------------
 
     def current_player_obj(self):
-        return (
-            self.black_player
-            if self.state.current_player == BLACK
-            else self.white_player
-        )
+        return self.session.current_player_obj()
 
     def is_current_ai(self) -> bool:
-        if self.mode == "HUMAN_VS_HUMAN":
-            return False
-        return isinstance(self.current_player_obj(), AIPlayer)
+        return self.session.is_current_ai()
+
+    def is_ai_thinking(self) -> bool:
+        return self.ai_future is not None
+
+    def ai_thinking_time(self) -> float:
+        return time.perf_counter() - self.ai_started_at if self.ai_future is not None else 0.0
+
+    def cancel_ai_search(self):
+        """Yêu cầu luồng AI dừng sớm và bỏ kết quả của lượt tìm kiếm đang chạy."""
+        if self.ai_future is not None:
+            self.ai_stop.set()
+            self.ai_future = None
+            self.ai_stop = None
+
+    def toggle_debug(self):
+        self.show_debug = not self.show_debug
+        self.dirty = True
+
+    def shutdown(self):
+        self.cancel_ai_search()
+        self.ai_executor.shutdown(wait=False)
 
     # ----------------- xử lý click -----------------
 
+    def human_color(self) -> int:
+        """Màu của người đang ngồi trước máy: bên tới lượt, hoặc đối thủ của AI khi tới lượt AI."""
+        color = self.state.current_player
+        return -color if self.is_current_ai() else color
+
     def handle_button_action(self, action: str):
+        self.dirty = True
+
+        # pass chỉ có nghĩa ở lượt của người: khi AI đang nghĩ thì bỏ qua, không hủy tìm kiếm
+        if action == "pass":
+            if not self.is_current_ai():
+                self.session.pass_turn(self.human_color())
+                self.save_record()
+            return
+
+        # các nút còn lại hủy lượt suy nghĩ đang chạy của AI
+        self.cancel_ai_search()
+
         if action == "new":
             self.setup_new_game()
             return
 
         if action == "mode_hvh":
-            self.mode = "HUMAN_VS_HUMAN"
+            self.session.mode = "HUMAN_VS_HUMAN"
             self.setup_new_game()
             return
 
         if action == "mode_hvai":
-            self.mode = "HUMAN_VS_AI"
+            self.session.mode = "HUMAN_VS_AI"
             self.setup_new_game()
             return
 
-        # các hành động còn lại không thực hiện nếu game đã over
-        if self.game_over:
-            return
-
-        if action == "pass":
-            self.state.pass_move()
-            self.check_game_over()
-            self.last_move = None # Xóa highlight khi pass
-            return
-
+        # resign không làm gì nếu game đã over (GameSession tự kiểm tra);
+        # luôn là người đầu hàng, kể cả khi bấm lúc AI đang nghĩ
         if action == "resign":
-            self.game_over = True
-            self.end_reason = "resign"
-            self.last_move = None
-            winner = "White" if self.state.current_player == BLACK else "Black"
-            self.result_text = f"{winner} wins by resignation !"
+            self.session.resign(self.human_color())
+            self.save_record()
             return
 
     def handle_click(self, pos):
@@ -119,78 +168,77 @@ class GameController:
     # ----------------- áp dụng nước đi -----------------
 
     def apply_move_and_update(self, move):
-        r, c = move
-        color = self.state.current_player
+        if self.session.play(move):
+            self.dirty = True
 
-        prev_b, prev_w = self.prev_black_stones, self.prev_white_stones
-
-        if self.board.apply_move(r, c, color):
-            b, w = self.board.count_stones()
-
-            if color == BLACK:
-                captured = prev_w - w
-                if captured > 0:
-                    self.captured_black += captured
-            else:
-                captured = prev_b - b
-                if captured > 0:
-                    self.captured_white += captured
-
-            self.prev_black_stones, self.prev_white_stones = b, w
-            
-            # Đặt quân -> reset pass counter
-            self.state.place_stone()
-            self.state.switch_player()
-            self.check_game_over()
-            self.last_move = (r, c) # Lưu nước đi mới
-        
-        else:
-            # Nước đi không hợp lệ → không đổi last_move
-            pass
-    def check_game_over(self):
-        if self.state.is_game_over():
-            self.game_over = True
-            self.end_reason = "pass"
-            black_score, white_score = self.calculate_final_score()
-            if black_score > white_score:
-                self.result_text = f"Black wins {black_score:.1f} - {white_score:.1f}"
-            elif white_score > black_score:
-                self.result_text = f"White wins {white_score:.1f} - {black_score:.1f}"
-            else:
-                self.result_text = f"Draw {black_score:.1f} - {black_score:.1f}"
-
-    # ----------------- tính điểm cuối game (Luật Trung Quốc) -----------------
     def calculate_final_score(self):
-        black_stones, white_stones = self.board.count_stones()
-        black_terr, white_terr = self.board.estimate_territory()
+        return self.session.final_score()
 
-        # Chinese rule: điểm = quân trên bàn + lãnh thổ
-        # (không cộng komi ở đây, bạn có thể +7.5 cho trắng nếu muốn)
-        black_score = black_stones + black_terr
-        white_score = white_stones + white_terr + 7.5  # komi 7.5 cho trắng
+    def save_record(self):
+        """Ghi biên bản SGF khi ván vừa kết thúc (mỗi ván một lần)."""
+        if not self.game_over or self.games_dir is None or self.record_path is not None:
+            return
+        stem = os.path.join(self.games_dir, time.strftime("%Y%m%d-%H%M%S"))
+        path = stem + ".sgf"
+        try:
+            os.makedirs(self.games_dir, exist_ok=True)
+            n = 1
+            while os.path.exists(path):   # nhiều ván kết thúc trong cùng một giây
+                path = f"{stem}-{n}.sgf"
+                n += 1
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self.session.to_sgf())
+        except OSError as e:
+            logger.warning("cannot save game record %s: %s", path, e)
+            return
+        self.record_path = path
 
-        return black_score, white_score
-    
     # ----------------- update mỗi frame -----------------
     
     def update(self):
         if self.game_over:
             return
-        if self.is_current_ai():
+        if not self.is_current_ai():
+            return
+
+        # Chưa có lượt tìm kiếm nào → gửi sang luồng AI rồi trả về ngay
+        if self.ai_future is None:
             player = self.current_player_obj()
-            move = player.choose_move(self.state)
-            if move is None:
-                # AI chọn pass
-                self.state.pass_move()  # AI cũng phải gọi pass_move()
-            else:
-                self.apply_move_and_update(move)
-            
-            self.check_game_over()
+            self.ai_stop = threading.Event()
+            self.ai_started_at = time.perf_counter()
+            self.ai_future = self.ai_executor.submit(player.search, self.state, self.ai_stop)
+            self.ai_future.add_done_callback(self._notify_ai_done)
+            self.dirty = True
+            return
+
+        if not self.ai_future.done():
+            return
+
+        future = self.ai_future
+        self.ai_future = None
+        self.ai_stop = None
+        move, self.last_stats = future.result()
+        if move is None:
+            # AI chọn pass
+            self.session.pass_turn()
+            self.save_record()
+        else:
+            self.session.play(move)
+        self.dirty = True
+
+    @staticmethod
+    def _notify_ai_done(future):
+        # chạy trên luồng AI; pygame.event.post an toàn giữa các luồng
+        try:
+            pygame.event.post(pygame.event.Event(AI_DONE_EVENT))
+        except pygame.error:
+            pass  # chưa có cửa sổ (chạy không giao diện): vòng lặp tự kiểm tra future
 
     # ----------------- vẽ -----------------
 
     def draw(self, screen):
-        self.ui.draw(screen)
+        # trả về các vùng màn hình đã vẽ lại, dùng cho pygame.display.update
+        return self.ui.draw(screen)
 
     # ----------------- kích thước cửa sổ -----------------
 
@@ -0,0 +1,160 @@
+# controllers/GameSession.py
+
+from typing import List, Optional, Tuple
+from ai import Minimax
+from models.FlatBoard import BOARD_BACKENDS
+from models.GameState import GameState, BLACK, WHITE
+from models.Sgf import to_sgf
+from players.HumanPlayer import HumanPlayer
+from players.AIPlayer import AIPlayer
+
+MODES = ("HUMAN_VS_AI", "HUMAN_VS_HUMAN")
+
+
+class GameSession:
+    """
+    Một ván cờ không phụ thuộc giao diện (không import pygame): bàn cờ, lượt đi, người chơi,
+    số quân bị bắt, pass / đầu hàng và tính điểm. GameController (Pygame) bọc lớp này;
+    script, arena, GTP dùng trực tiếp.
+    """
+
+    def __init__(self, mode: str = "HUMAN_VS_AI", backend: str = "list"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode: {mode}")
+        if backend not in BOARD_BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
+        self.mode = mode  # "HUMAN_VS_AI" hoặc "HUMAN_VS_HUMAN"
+        self.backend = backend
+        self.new_game()
+
+    # ----------------- tạo / reset game -----------------
+
+    def new_game(self):
+        self.board = BOARD_BACKENDS[self.backend]()
+        self.state = GameState(board=self.board, current_player=BLACK)
+        # bảng chuyển vị của các worker tìm kiếm song song không mang sang ván mới
+        Minimax.new_game()
+
+        if self.mode == "HUMAN_VS_HUMAN":
+            self.black_player = HumanPlayer(BLACK, "Black")
+            self.white_player = HumanPlayer(WHITE, "White")
+        else:
+            self.black_player = HumanPlayer(BLACK, "Human")
+            self.white_player = AIPlayer(WHITE, "Computer")
+
+        # captured
+        self.prev_black_stones, self.prev_white_stones = self.board.count_stones()
+        self.captured_black = 0
+        self.captured_white = 0
+
+        self.game_over = False
+        self.end_reason = ""
+        self.result_text = ""
+        # kết quả theo cú pháp SGF: "B+3.5", "W+R", "0" (hòa)
+        self.result = ""
+        # Vị trí nước đi cuối (row, col) hoặc None
+        self.last_move = None
+        # biên bản ván: (màu, (row, col) hoặc None = pass)
+        self.moves: List[Tuple[int, Optional[Tuple[int, int]]]] = []
+
+    # ----------------- tiện ích -----------------
+
+    def current_player_obj(self):
+        return (
+            self.black_player
+            if self.state.current_player == BLACK
+            else self.white_player
+        )
+
+    def is_current_ai(self) -> bool:
+        if self.mode == "HUMAN_VS_HUMAN":
+            return False
+        return isinstance(self.current_player_obj(), AIPlayer)
+
+    # ----------------- nước đi -----------------
+
+    def play(self, move: Tuple[int, int]) -> bool:
+        """Bên tới lượt đặt quân tại move; trả về False nếu nước đi không hợp lệ."""
+        if self.game_over:
+            return False
+        r, c = move
+        color = self.state.current_player
+
+        prev_b, prev_w = self.prev_black_stones, self.prev_white_stones
+
+        if not self.board.apply_move(r, c, color):
+            # Nước đi không hợp lệ → không đổi last_move
+            return False
+        b, w = self.board.count_stones()
+
+        if color == BLACK:
+            captured = prev_w - w
+            if captured > 0:
+                self.captured_black += captured
+        else:
+            captured = prev_b - b
+            if captured > 0:
+                self.captured_white += captured
+
+        self.prev_black_stones, self.prev_white_stones = b, w
+
+        # Đặt quân -> reset pass counter
+        self.state.place_stone()
+        self.state.switch_player()
+        self.last_move = (r, c) # Lưu nước đi mới
+        self.moves.append((color, (r, c)))
+        self.check_game_over()
+        return True
+
+    def pass_turn(self, color: int = None) -> bool:
+        """Bên color (mặc định bên tới lượt) pass; trả về False nếu chưa tới lượt bên đó."""
+        if self.game_over:
+            return False
+        if color is not None and color != self.state.current_player:
+            return False
+        self.moves.append((self.state.current_player, None))
+        self.state.pass_move()
+        self.last_move = None # Xóa highlight khi pass
+        self.check_game_over()
+        return True
+
+    def resign(self, color: int = None):
+        """Bên color (mặc định bên tới lượt) đầu hàng; được phép cả khi không phải lượt mình."""
+        if self.game_over:
+            return
+        if color is None:
+            color = self.state.current_player
+        self.game_over = True
+        self.end_reason = "resign"
+        self.last_move = None
+        winner = "White" if color == BLACK else "Black"
+        self.result_text = f"{winner} wins by resignation !"
+        self.result = f"{winner[0]}+R"
+
+    def check_game_over(self):
+        if self.state.is_game_over():
+            self.game_over = True
+            self.end_reason = "pass"
+            black_score, white_score = self.final_score()
+            if black_score > white_score:
+                self.result_text = f"Black wins {black_score:.1f} - {white_score:.1f}"
+                self.result = f"B+{black_score - white_score:g}"
+            elif white_score > black_score:
+                self.result_text = f"White wins {white_score:.1f} - {black_score:.1f}"
+                self.result = f"W+{white_score - black_score:g}"
+            else:
+                self.result_text = f"Draw {black_score:.1f} - {black_score:.1f}"
+                self.result = "0"
+
+    # ----------------- tính điểm cuối game (Luật Trung Quốc) -----------------
+
+    def final_score(self) -> Tuple[float, float]:
+        # Chinese rule: điểm = quân trên bàn + lãnh thổ, komi 7.5 cho trắng (Board.final_score)
+        return self.board.final_score()
+
+    # ----------------- biên bản SGF -----------------
+
+    def to_sgf(self) -> str:
+        """Biên bản ván (đang chơi hoặc đã xong) dạng SGF; RE chỉ có khi ván đã kết thúc."""
+        return to_sgf(self.moves, self.board.size, result=self.result,
+                      black=self.black_player.name, white=self.white_player.name)
@@ -0,0 +1,212 @@
+# controllers/Profiler.py
+
+import bisect
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+PROFILE_ENV = "GO_PROFILE"          # "trace", "cprofile" hoặc "trace,cprofile"
+PROFILE_OUT_ENV = "GO_PROFILE_OUT"  # tiền tố tên file kết quả
+MODES = ("trace", "cprofile")
+DEFAULT_OUTPUT = "profile"
+
+# cận trên (ms) của các ô histogram; ô cuối chứa mọi giá trị lớn hơn
+BUCKETS_MS = (1, 2, 4, 8, 16, 33, 66, 133, 250, 500, 1000, 2000, 4000)
+
+
+class Histogram:
+    """Histogram thời gian theo BUCKETS_MS, giữ thêm tổng và max."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def percentile(self, p: float) -> float:
+        """
+        Phân vị p (ms), nội suy tuyến tính trong ô chứa nó và không vượt quá max
+        (lấy thẳng cận trên của ô thì p50 có thể lớn hơn max); ô cuối trả về max.
+        """
+        target = self.count * p / 100
+        top = self.max * 1000
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= target:
+                if i == len(BUCKETS_MS):
+                    return top
+                low = BUCKETS_MS[i - 1] if i else 0.0
+                high = min(BUCKETS_MS[i], top)
+                return low + (high - low) * max(target - seen, 0) / n
+            seen += n
+        return 0.0
+
+    def as_dict(self) -> dict:
+        labels = [f"<={b}ms" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "mean_ms": self.total * 1000 / self.count if self.count else 0.0,
+            "max_ms": self.max * 1000,
+            "buckets": {label: n for label, n in zip(labels, self.counts) if n},
+        }
+
+
+class Profiler:
+    """
+    Chế độ profile bật theo yêu cầu (GO_PROFILE hoặc main.py --profile).
+    install() thay GameController.update, GameUI.draw và choose_ai_move bằng bản bọc
+    đo thời gian; khi không bật thì không cài gì nên không tốn chi phí nào.
+    - trace: ghi mỗi lần gọi thành một sự kiện Chrome trace (mở bằng chrome://tracing
+      hoặc Perfetto), mỗi luồng một hàng nên tách được luồng vẽ và luồng AI.
+    - cprofile: một cProfile.Profile, chỉ bật trong choose_ai_move (luồng AI). Python 3.12+
+      chỉ cho một profiler hoạt động mỗi lúc (sys.monitoring) và profiler đó nhận lời gọi của
+      mọi luồng, nên không bật được profiler riêng cho luồng vẽ; phía vẽ xem qua trace và
+      histogram. Trên 3.12+ file pstats có thể lẫn lời gọi của luồng vẽ trong lúc AI nghĩ.
+    Luôn giữ histogram thời gian theo từng frame và từng nước AI.
+    """
+
+    def __init__(self, modes=("trace",), output: str = DEFAULT_OUTPUT):
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise ValueError(f"Unknown profile mode: {', '.join(sorted(unknown))}")
+        self.trace = "trace" in modes
+        self.cprofile = "cprofile" in modes
+        self.output = output
+        self.origin = time.perf_counter()
+        self.lock = threading.Lock()
+        self.events: List[dict] = []
+        self.histograms: Dict[str, Histogram] = {}
+        self.profile = cProfile.Profile() if self.cprofile else None
+        self.thread_names: Dict[int, str] = {}
+        self.last_frame: Optional[float] = None
+        self._restore = []
+
+    @classmethod
+    def from_env(cls, modes: Optional[str] = None, output: Optional[str] = None) -> Optional["Profiler"]:
+        """Tạo Profiler nếu được bật (tham số dòng lệnh ưu tiên hơn biến môi trường), không thì None."""
+        modes = modes or os.environ.get(PROFILE_ENV)
+        if not modes:
+            return None
+        output = output or os.environ.get(PROFILE_OUT_ENV) or DEFAULT_OUTPUT
+        return cls([m.strip() for m in modes.split(",") if m.strip()], output)
+
+    # ---------- cài đặt ----------
+
+    def install(self, controller):
+        import players.AIPlayer as ai_player
+        self._patch(controller, "update", "update")
+        self._patch(controller.ui, "draw", "draw")
+        # AIPlayer gọi choose_ai_move qua tên đã import vào module của nó
+        self._patch(ai_player, "choose_ai_move", "ai_move", profiled=True)
+
+    def uninstall(self):
+        for target, attr, original in reversed(self._restore):
+            if original is None:
+                delattr(target, attr)
+            else:
+                setattr(target, attr, original)
+        self._restore.clear()
+
+    def _patch(self, target, attr: str, name: str, profiled: bool = False):
+        # thuộc tính của instance thì lưu None để uninstall xóa đi, lộ lại method của lớp
+        own = attr in vars(target)
+        self._restore.append((target, attr, getattr(target, attr) if own else None))
+        setattr(target, attr, self.wrap(name, getattr(target, attr), profiled))
+
+    def wrap(self, name: str, fn, profiled: bool = False):
+        """profiled: bật cProfile trong lúc gọi fn; chỉ dùng cho hàm không chạy chồng lên nhau."""
+        def wrapper(*args, **kwargs):
+            profile = self.profile if profiled else None
+            start = time.perf_counter()
+            if profile is not None:
+                try:
+                    profile.enable()
+                except ValueError:
+                    # đã có profiler khác đang chạy (3.12+: debugger, coverage...): chỉ đo thời gian
+                    profile = None
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                if profile is not None:
+                    profile.disable()
+                self._record(name, start, time.perf_counter() - start)
+        wrapper.__wrapped__ = fn
+        return wrapper
+
+    # ---------- ghi nhận ----------
+
+    def mark_frame(self):
+        """Gọi một lần mỗi vòng lặp chính: histogram "frame" đo khoảng cách giữa hai frame."""
+        now = time.perf_counter()
+        if self.last_frame is not None:
+            self._add("frame", now - self.last_frame)
+        self.last_frame = now
+
+    def _add(self, name: str, seconds: float):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(seconds)
+
+    def _record(self, name: str, start: float, seconds: float):
+        self._add(name, seconds)
+        if self.trace:
+            thread = threading.current_thread()
+            with self.lock:
+                self.thread_names[thread.ident] = thread.name
+                self.events.append({
+                    "name": name, "ph": "X", "pid": os.getpid(), "tid": thread.ident,
+                    "ts": (start - self.origin) * 1e6, "dur": seconds * 1e6,
+                })
+
+    # ---------- xuất kết quả ----------
+
+    def dump(self, stream=sys.stderr) -> List[str]:
+        """Ghi file trace / pstats, in tóm tắt histogram; trả về danh sách file đã ghi."""
+        written = []
+        if self.trace:
+            path = f"{self.output}.trace.json"
+            meta = [
+                {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid,
+                 "args": {"name": name}}
+                for tid, name in self.thread_names.items()
+            ]
+            with open(path, "w") as f:
+                json.dump({"traceEvents": meta + self.events,
+                           "otherData": {"histograms": self.summary()}}, f)
+            written.append(path)
+        if self.profile is not None:
+            path = f"{self.output}.ai_move.pstats"
+            self.profile.dump_stats(path)
+            written.append(path)
+        print(self.format_summary(), file=stream)
+        for path in written:
+            print(f"profile written: {path}", file=stream)
+        return written
+
+    def summary(self) -> Dict[str, dict]:
+        with self.lock:
+            return {name: h.as_dict() for name, h in self.histograms.items()}
+
+    def format_summary(self) -> str:
+        lines = [f"{'span':<10}{'count':>8}{'mean ms':>10}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>10}"]
+        with self.lock:
+            for name, h in sorted(self.histograms.items()):
+                mean = h.total * 1000 / h.count if h.count else 0.0
+                lines.append(f"{name:<10}{h.count:>8}{mean:>10.2f}{h.percentile(50):>9.0f}"
+                             f"{h.percentile(95):>9.0f}{h.max * 1000:>10.1f}")
+        return "\n".join(lines)
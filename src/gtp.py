@@ -0,0 +1,315 @@
+# gtp.py
+#
+# Giao tiếp GTP (Go Text Protocol) qua stdin/stdout để chạy AI từ công cụ giải đấu
+# (gogui, sabaki, twogtp...) hoặc script. Tiến trình sống suốt phiên nên bảng chuyển vị,
+# cache Benson, bảng mẫu... được giữ giữa các lệnh.
+# Ví dụ (chạy trong thư mục src):
+#   python gtp.py --depth 4
+#   printf 'boardsize 9\nplay b e5\ngenmove w\nquit\n' | python gtp.py
+
+import argparse
+import sys
+from typing import List, Optional, Tuple
+from ai import Minimax
+from ai.Minimax import choose_ai_move, TIME_BUDGET, MAX_DEPTH
+from ai.SearchStats import SearchStats
+from ai.TranspositionTable import TranspositionTable
+from models.Board import Board, KOMI
+from models.GameState import GameState, BOARD_SIZE, BLACK, WHITE, EMPTY
+
+NAME = "Go 9x9 Minimax"
+VERSION = "1.0"
+PROTOCOL_VERSION = "2"
+COLUMNS = "ABCDEFGHJKLMNOPQRSTUVWXYZ"   # GTP bỏ chữ I
+MAX_SIZE = len(COLUMNS)
+SAFETY = 0.8           # chỉ dùng phần này của thời gian được chia cho mỗi nước
+OVERHEAD = 0.05        # giây trừ hao cho việc đọc / ghi lệnh
+MIN_MOVES_LEFT = 10    # thời gian chính chia cho ít nhất chừng này nước
+
+
+class GtpError(Exception):
+    """Lệnh sai: trả về "? <thông báo>"."""
+
+
+class TimeControl:
+    """
+    Thời gian theo time_settings / time_left của GTP: main_time giây thời gian chính,
+    rồi byo-yomi byo_yomi_time giây cho mỗi byo_yomi_stones nước.
+    """
+
+    def __init__(self, main_time: float = 0.0, byo_yomi_time: float = 0.0, byo_yomi_stones: int = 0):
+        self.main_time = main_time
+        self.byo_yomi_time = byo_yomi_time
+        self.byo_yomi_stones = byo_yomi_stones
+        # time_left: màu -> (giây còn lại, số nước còn lại trong kỳ byo-yomi; 0 = đang ở thời gian chính)
+        self.left = {}
+
+    @property
+    def unlimited(self) -> bool:
+        # theo GTP: byo_yomi_time > 0 và byo_yomi_stones = 0 nghĩa là không giới hạn
+        return self.byo_yomi_time > 0 and self.byo_yomi_stones == 0
+
+    def budget(self, color: int, empty_points: int, default: float = TIME_BUDGET) -> float:
+        """
+        Số giây cho nước sắp đi. Không giới hạn thời gian (GUI hay gửi time_settings 0 1 0)
+        vẫn dùng default: tìm đủ MAX_DEPTH có thể mất hơn một phút cho một nước.
+        """
+        if self.unlimited:
+            return default
+        seconds, stones = self.left.get(color, (self.main_time, 0))
+        if stones > 0:
+            # byo-yomi: chia đều thời gian còn lại của kỳ cho số nước còn phải đi
+            share = seconds / stones
+        else:
+            # thời gian chính: ước lượng mỗi bên còn khoảng (số ô trống / 4) nước
+            share = seconds / max(MIN_MOVES_LEFT, empty_points // 4)
+            if self.byo_yomi_stones > 0:
+                share += self.byo_yomi_time / self.byo_yomi_stones
+        return max(0.01, share * SAFETY - OVERHEAD)
+
+
+class GtpEngine:
+    """Trạng thái một phiên GTP: bàn cờ, lịch sử để undo, komi, thời gian, bảng chuyển vị."""
+
+    def __init__(self, max_depth: int = MAX_DEPTH, time_budget: float = TIME_BUDGET,
+                 workers: int = 1, verbose: bool = False):
+        self.max_depth = max_depth
+        self.default_budget = time_budget   # khi chưa có time_settings
+        self.workers = workers
+        self.verbose = verbose
+        self.size = BOARD_SIZE
+        self.komi = KOMI
+        self.time = None
+        self.running = True
+        # bảng chuyển vị lưu giá trị theo góc nhìn bên tìm kiếm nên mỗi màu một bảng
+        self.tts = {BLACK: TranspositionTable(), WHITE: TranspositionTable()}
+        self.commands = {
+            "protocol_version": lambda args: PROTOCOL_VERSION,
+            "name": lambda args: NAME,
+            "version": lambda args: VERSION,
+            "known_command": lambda args: "true" if args and args[0] in self.commands else "false",
+            "list_commands": lambda args: "\n".join(sorted(self.commands)),
+            "quit": self.cmd_quit,
+            "boardsize": self.cmd_boardsize,
+            "clear_board": self.cmd_clear_board,
+            "komi": self.cmd_komi,
+            "play": self.cmd_play,
+            "genmove": self.cmd_genmove,
+            "undo": self.cmd_undo,
+            "final_score": self.cmd_final_score,
+            "time_settings": self.cmd_time_settings,
+            "time_left": self.cmd_time_left,
+            "showboard": self.cmd_showboard,
+        }
+        self.clear()
+
+    def clear(self):
+        self.board = Board(self.size)
+        self.state = GameState(board=self.board)
+        self.moves: List[Tuple[int, Optional[Tuple[int, int]]]] = []   # (màu, nước hoặc None = pass)
+        # ván mới: xóa bảng chuyển vị của cả hai màu, kể cả bảng trong các worker
+        for tt in self.tts.values():
+            tt.clear()
+        Minimax.new_game()
+
+    # ---------- tọa độ ----------
+
+    def parse_vertex(self, text: str) -> Optional[Tuple[int, int]]:
+        """"D4" -> (hàng, cột) của Board (hàng 0 ở trên); "pass" -> None."""
+        text = text.upper()
+        if text == "PASS":
+            return None
+        try:
+            col = COLUMNS.index(text[0])
+            row = self.size - int(text[1:])
+        except (ValueError, IndexError):
+            raise GtpError("invalid coordinate")
+        if not (0 <= row < self.size and 0 <= col < self.size):
+            raise GtpError("invalid coordinate")
+        return row, col
+
+    def format_vertex(self, move: Optional[Tuple[int, int]]) -> str:
+        if move is None:
+            return "pass"
+        row, col = move
+        return f"{COLUMNS[col]}{self.size - row}"
+
+    @staticmethod
+    def parse_color(text: str) -> int:
+        text = text.lower()
+        if text in ("b", "black"):
+            return BLACK
+        if text in ("w", "white"):
+            return WHITE
+        raise GtpError("invalid color")
+
+    # ---------- lệnh ----------
+
+    def cmd_quit(self, args):
+        self.running = False
+        return ""
+
+    def cmd_boardsize(self, args):
+        try:
+            size = int(args[0])
+        except (ValueError, IndexError):
+            raise GtpError("boardsize not an integer")
+        if not 2 <= size <= MAX_SIZE:
+            raise GtpError("unacceptable size")
+        self.size = size
+        self.clear()
+        return ""
+
+    def cmd_clear_board(self, args):
+        self.clear()
+        return ""
+
+    def cmd_komi(self, args):
+        try:
+            self.komi = float(args[0])
+        except (ValueError, IndexError):
+            raise GtpError("komi not a float")
+        return ""
+
+    def cmd_play(self, args):
+        if len(args) < 2:
+            raise GtpError("invalid color or coordinate")
+        color = self.parse_color(args[0])
+        move = self.parse_vertex(args[1])
+        self.apply(color, move)
+        return ""
+
+    def apply(self, color: int, move: Optional[Tuple[int, int]]):
+        # pass / đặt quân qua GameState như GameSession, để hai lần pass liên tiếp kết thúc ván
+        self.state.current_player = color
+        if move is None:
+            self.state.pass_move()
+        else:
+            if not self.board.play(move[0], move[1], color):
+                raise GtpError("illegal move")
+            self.state.place_stone()
+            self.state.switch_player()
+        self.moves.append((color, move))
+
+    def cmd_genmove(self, args):
+        if not args:
+            raise GtpError("invalid color")
+        color = self.parse_color(args[0])
+        stats = SearchStats()
+        if self.state.is_game_over():
+            # ván đã kết thúc bằng hai lần pass: không tìm kiếm, chỉ pass tiếp
+            budget = 0.0
+            move = None
+        else:
+            if self.time is None:
+                budget = self.default_budget
+            else:
+                empty = sum(1 for row in self.board.grid for cell in row if cell == EMPTY)
+                budget = self.time.budget(color, empty, self.default_budget)
+            move = choose_ai_move(self.board, color, self.tts[color], budget, self.max_depth,
+                                  workers=self.workers, stats=stats)
+        if move is not None and not self.board.is_legal(move[0], move[1], color):
+            move = None   # không bao giờ gửi nước phạm luật cho bộ điều khiển
+        self.apply(color, move)
+        if self.verbose:
+            print(f"genmove {self.format_vertex(move)}: budget={budget} depth={stats.depth} "
+                  f"nodes={stats.nodes} time={stats.seconds:.2f}s", file=sys.stderr)
+        return self.format_vertex(move)
+
+    def cmd_undo(self, args):
+        if not self.moves:
+            raise GtpError("cannot undo")
+        color, move = self.moves.pop()
+        if move is not None:
+            self.board.undo()
+        self.state.current_player = color
+        # số lần pass liên tiếp của thế cờ trước nước vừa bỏ
+        passes = 0
+        for _, earlier in reversed(self.moves):
+            if earlier is not None:
+                break
+            passes += 1
+        self.state.consecutive_passes = passes
+        return ""
+
+    def cmd_final_score(self, args):
+        black, white = self.board.final_score(self.komi)
+        if black == white:
+            return "0"
+        return f"B+{black - white:g}" if black > white else f"W+{white - black:g}"
+
+    def cmd_time_settings(self, args):
+        try:
+            main_time, byo_time, byo_stones = float(args[0]), float(args[1]), int(args[2])
+        except (ValueError, IndexError):
+            raise GtpError("syntax error")
+        self.time = TimeControl(main_time, byo_time, byo_stones)
+        return ""
+
+    def cmd_time_left(self, args):
+        if len(args) < 3:
+            raise GtpError("syntax error")
+        color = self.parse_color(args[0])
+        try:
+            seconds, stones = float(args[1]), int(args[2])
+        except ValueError:
+            raise GtpError("syntax error")
+        if self.time is None:
+            self.time = TimeControl()
+        self.time.left[color] = (seconds, stones)
+        return ""
+
+    def cmd_showboard(self, args):
+        rows = []
+        for r in range(self.size):
+            cells = " ".join(".XO"[self.board.grid[r][c]] for c in range(self.size))
+            rows.append(f"{self.size - r:>2} {cells}")
+        rows.append("   " + " ".join(COLUMNS[:self.size]))
+        return "\n" + "\n".join(rows)
+
+    # ---------- vòng lặp ----------
+
+    def handle(self, line: str) -> Optional[str]:
+        """Xử lý một dòng lệnh, trả về phản hồi đầy đủ (kể cả dòng trống kết thúc) hoặc None nếu bỏ qua."""
+        line = "".join(ch for ch in line.split("#", 1)[0] if ch == "\t" or ch >= " ")
+        parts = line.replace("\t", " ").split()
+        if not parts:
+            return None
+        cmd_id = ""
+        if parts[0].isdigit():
+            cmd_id = parts.pop(0)
+            if not parts:
+                return None
+        name, args = parts[0].lower(), parts[1:]
+        handler = self.commands.get(name)
+        try:
+            if handler is None:
+                raise GtpError("unknown command")
+            result = handler(args)
+        except GtpError as e:
+            return f"?{cmd_id} {e}\n\n"
+        return f"={cmd_id} {result}".rstrip(" ") + "\n\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GTP engine over stdin/stdout")
+    parser.add_argument("--depth", type=int, default=MAX_DEPTH, help="maximum search depth")
+    parser.add_argument("--time", type=float, default=TIME_BUDGET,
+                        help="seconds per move when the controller sends no time_settings")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="log search stats to stderr")
+    args = parser.parse_args()
+
+    engine = GtpEngine(args.depth, args.time, args.workers, args.verbose)
+    for line in sys.stdin:
+        response = engine.handle(line)
+        if response is None:
+            continue
+        sys.stdout.write(response)
+        sys.stdout.flush()
+        if not engine.running:
+            break
+
+
+if __name__ == "__main__":
+    main()
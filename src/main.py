@@ -1,36 +1,84 @@
-import pygame
-from controllers.GameController import GameController
+import argparse
+import logging
+from controllers.Profiler import Profiler, MODES
 
-FPS = 30
+FPS = 60                  # trần số lần vẽ mỗi giây
+IDLE_TIMEOUT_MS = 1000    # lượt người, không có gì đổi: ngủ chờ sự kiện tối đa chừng này
+THINKING_TIMEOUT_MS = 100 # AI đang nghĩ: thức dậy để cập nhật đồng hồ "thinking"
 
 def main():
+    parser = argparse.ArgumentParser(description="Go 9x9")
+    parser.add_argument("--profile", metavar="MODES",
+                        help=f"comma-separated profiling modes: {', '.join(MODES)} "
+                             "(default: $GO_PROFILE, off when unset)")
+    parser.add_argument("--profile-out", metavar="PREFIX",
+                        help="output file prefix (default: $GO_PROFILE_OUT or 'profile')")
+    parser.add_argument("--search-log", metavar="PATH",
+                        help="append one JSON line of search stats per AI move to PATH (default: off)")
+    parser.add_argument("--save-games", metavar="DIR",
+                        help="save each finished game as an SGF file in DIR (default: off)")
+    args = parser.parse_args()
+
+    # mỗi nước AI một dòng JSON SearchStats (players/AIPlayer.py); không bật thì không ghi file nào
+    if args.search_log:
+        logging.basicConfig(filename=args.search_log, level=logging.INFO,
+                            format="%(asctime)s %(name)s %(message)s")
+
+    # pygame / SDL chỉ được nạp khi thật sự mở giao diện: tiến trình worker (spawn nạp lại
+    # module __main__), --help và các công cụ dùng GameSession không đụng tới SDL
+    import pygame
+    from controllers.GameController import GameController, AI_DONE_EVENT
     pygame.init()
 
-    controller = GameController(mode="HUMAN_VS_AI")
+    controller = GameController(mode="HUMAN_VS_AI", games_dir=args.save_games)
     window_width, window_height = controller.get_window_size()
     screen = pygame.display.set_mode((window_width, window_height))
     pygame.display.set_caption("Go 9x9 - Minimax")
 
+    # chỉ cài các hàm bọc khi được bật; tắt thì vòng lặp không đổi gì
+    profiler = Profiler.from_env(args.profile, args.profile_out)
+    if profiler is not None:
+        profiler.install(controller)
+
     clock = pygame.time.Clock()
     running = True
 
+    # Vòng lặp theo sự kiện: ngủ trong pygame.event.wait cho tới khi có input, luồng AI
+    # báo xong (AI_DONE_EVENT) hoặc hết timeout; chỉ vẽ khi controller.dirty
     while running:
-        clock.tick(60)
+        if controller.is_current_ai():
+            controller.update()   # gửi lượt tìm kiếm mới hoặc nhận nước vừa tìm xong
+        timeout = THINKING_TIMEOUT_MS if controller.is_ai_thinking() else IDLE_TIMEOUT_MS
+        events = [pygame.event.wait(timeout)] + pygame.event.get()
 
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 controller.handle_click(event.pos)
-                controller.draw(screen)
-                pygame.display.flip()
-                
-        if controller.is_current_ai():
-            controller.update()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_d:
+                controller.toggle_debug()
+            elif event.type == pygame.MOUSEMOTION:
+                controller.dirty = True   # hover nút / quân mờ
+            elif event.type == pygame.WINDOWEXPOSED:
+                controller.ui.invalidate()
+                controller.dirty = True
+            elif event.type == AI_DONE_EVENT:
+                controller.update()
+        if controller.is_ai_thinking():
+            controller.dirty = True       # đồng hồ suy nghĩ trên panel
 
-        controller.draw(screen)
-        pygame.display.flip()
+        if controller.dirty and running:
+            controller.dirty = False
+            if profiler is not None:
+                profiler.mark_frame()
+            # chỉ đẩy lên màn hình các vùng đã vẽ lại
+            pygame.display.update(controller.draw(screen))
+            clock.tick(FPS)
 
+    controller.shutdown()
+    if profiler is not None:
+        profiler.dump()
     pygame.quit()
 
 
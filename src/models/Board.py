@@ -1,103 +1,516 @@
 # models/Board.py
 
-from collections import deque
-from typing import Set, Tuple, List
+import random
+from array import array
+from dataclasses import dataclass
+from typing import Set, Tuple, List, Optional
 from .GameState import BOARD_SIZE, EMPTY, BLACK, WHITE
 
+KOMI = 7.5
+
+# Bảng Zobrist theo kích thước bàn: ZOBRIST[size][color][x][y] -> số ngẫu nhiên 64 bit
+ZOBRIST = {}
+
+
+def zobrist_table(size: int):
+    # seed cố định để khóa giống nhau giữa các lần chạy và các tiến trình
+    if size not in ZOBRIST:
+        rng = random.Random(size)
+        ZOBRIST[size] = {
+            color: [[rng.getrandbits(64) for _ in range(size)] for _ in range(size)]
+            for color in (BLACK, WHITE)
+        }
+    return ZOBRIST[size]
+
+
+# Bảng hàng xóm dựng sẵn: NEIGHBORS[size][x][y] -> tuple các điểm kề trong bàn
+NEIGHBORS = {}
+
+
+def neighbor_table(size: int):
+    if size not in NEIGHBORS:
+        NEIGHBORS[size] = [
+            [
+                tuple(
+                    (x + dx, y + dy)
+                    for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]
+                    if 0 <= x + dx < size and 0 <= y + dy < size
+                )
+                for y in range(size)
+            ]
+            for x in range(size)
+        ]
+    return NEIGHBORS[size]
+
+
+# Mã mẫu 3x3 của một điểm: 8 ô xung quanh theo thứ tự PATTERN_DIRS, mỗi ô 2 bit
+# (0 trống, 1 đen, 2 trắng, 3 ngoài bàn) -> số nguyên 16 bit, dùng làm chỉ số bảng mẫu
+PATTERN_DIRS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+OFF_BOARD = 3
+
+# PATTERN_TABLES[size] = (mã ban đầu của bàn trống, [x][y] -> tuple (qx, qy, shift)
+# của các điểm q nhìn thấy (x, y) trong mẫu của mình và vị trí bit tương ứng)
+PATTERN_TABLES = {}
+
+
+def pattern_tables(size: int):
+    if size not in PATTERN_TABLES:
+        empty_codes = [[0] * size for _ in range(size)]
+        watchers = [[[] for _ in range(size)] for _ in range(size)]
+        for x in range(size):
+            for y in range(size):
+                for k, (dx, dy) in enumerate(PATTERN_DIRS):
+                    nx, ny = x + dx, y + dy
+                    if 0 <= nx < size and 0 <= ny < size:
+                        watchers[nx][ny].append((x, y, 2 * k))
+                    else:
+                        empty_codes[x][y] |= OFF_BOARD << (2 * k)
+        PATTERN_TABLES[size] = (
+            empty_codes,
+            [[tuple(cell) for cell in row] for row in watchers],
+        )
+    return PATTERN_TABLES[size]
+
+
+# Bản đồ ảnh hưởng (giảm dần theo khoảng cách Manhattan): quân ở khoảng cách d
+# cộng INFLUENCE_WEIGHTS[d - 1] vào điểm đó (đen dương, trắng âm)
+INFLUENCE_WEIGHTS = (4, 2, 1)
+INFLUENCE_THRESHOLD = 4   # |ảnh hưởng| tối thiểu để ô trống được tính là lãnh thổ
+
+# INFLUENCE_TABLES[size][x][y] -> tuple (qx, qy, trọng số) các điểm chịu ảnh hưởng của (x, y)
+INFLUENCE_TABLES = {}
+
+
+def influence_table(size: int):
+    if size not in INFLUENCE_TABLES:
+        radius = len(INFLUENCE_WEIGHTS)
+        INFLUENCE_TABLES[size] = [
+            [
+                tuple(
+                    (x + dx, y + dy, INFLUENCE_WEIGHTS[abs(dx) + abs(dy) - 1])
+                    for dx in range(-radius, radius + 1)
+                    for dy in range(-radius, radius + 1)
+                    if 0 < abs(dx) + abs(dy) <= radius
+                    and 0 <= x + dx < size and 0 <= y + dy < size
+                )
+                for y in range(size)
+            ]
+            for x in range(size)
+        ]
+    return INFLUENCE_TABLES[size]
+
+
+class Chain:
+    """
+    Một chuỗi quân cùng màu nối liền nhau, kèm tập khí của chuỗi.
+    Board cập nhật các chuỗi tăng dần khi đặt quân, gộp chuỗi và bắt quân.
+    """
+    __slots__ = ("color", "stones", "liberties", "key")
+
+    def __init__(self, color: int, stones: Set[Tuple[int, int]], liberties: Set[Tuple[int, int]], key: int):
+        self.color = color
+        self.stones = stones
+        self.liberties = liberties
+        self.key = key  # XOR Zobrist của các quân trong chuỗi
+
+
+@dataclass(slots=True)
+class BoardFeatures:
+    """Các đặc trưng heuristic của cả hai màu, tính trong một lần duyệt bàn cờ."""
+    black_stones: int = 0
+    white_stones: int = 0
+    black_liberties: int = 0
+    white_liberties: int = 0
+    black_threatened: int = 0   # số chuỗi có <= 2 khí
+    white_threatened: int = 0
+    black_territory: int = 0
+    white_territory: int = 0
+
 
 class Board:
     def __init__(self, size: int = BOARD_SIZE):
         self.size = size
         self.grid = [[EMPTY for _ in range(size)] for _ in range(size)]
+        self.adj = neighbor_table(size)
+        # chain_at[x][y]: chuỗi chứa điểm (x, y), None nếu trống
+        self.chain_at = [[None for _ in range(size)] for _ in range(size)]
+        # các chuỗi đang có trên bàn
+        self.chains: Set[Chain] = set()
+        # ngăn xếp undo cho play()/undo() (dùng trong tìm kiếm)
+        self.undo_stack: List[tuple] = []
+        # cache nước hợp lệ theo màu (None = chưa tính) và các điểm cần kiểm tra lại
+        self._legal_cache = {BLACK: None, WHITE: None}
+        self._dirty = {BLACK: set(), WHITE: set()}
+        # khóa Zobrist của thế cờ hiện tại, cập nhật tăng dần khi đặt / bắt quân
+        self.zobrist = zobrist_table(size)
+        self.hash = 0
+        # tập khóa các thế cờ đã xuất hiện (GameState gắn vào); None = không xét superko
+        self.history: Optional[Set[int]] = None
+        # mã mẫu 3x3 của từng điểm, cập nhật tăng dần mỗi khi một ô đổi màu
+        empty_codes, self._pattern_watchers = pattern_tables(size)
+        self.patterns = [row[:] for row in empty_codes]
+        # bản đồ ảnh hưởng 1 chiều (chỉ số x * size + y), cộng / trừ quanh mỗi quân đặt / nhấc
+        self._influence_kernel = [
+            tuple((qx * size + qy, w) for qx, qy, w in cell)
+            for row in influence_table(size) for cell in row
+        ]
+        self.influence = [0] * (size * size)
 
     # ---------- tiện ích cơ bản ----------
     def in_bounds(self, x: int, y: int) -> bool:
         return 0 <= x < self.size and 0 <= y < self.size
 
     def neighbors(self, x: int, y: int):
-        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            nx, ny = x + dx, y + dy
-            if self.in_bounds(nx, ny):
-                yield nx, ny
+        return self.adj[x][y]
 
     def copy(self) -> "Board":
+        """Bản sao độc lập của thế cờ (không sao chép undo_stack)."""
         new_b = Board(self.size)
         new_b.grid = [row[:] for row in self.grid]
+        new_b.patterns = [row[:] for row in self.patterns]
+        new_b.influence = self.influence[:]
+        new_b.hash = self.hash
+        if self.history is not None:
+            new_b.history = set(self.history)
+        for chain in self.chains:
+            nc = Chain(chain.color, set(chain.stones), set(chain.liberties), chain.key)
+            new_b.chains.add(nc)
+            for sx, sy in nc.stones:
+                new_b.chain_at[sx][sy] = nc
+        for color in (BLACK, WHITE):
+            if self._legal_cache[color] is not None:
+                new_b._legal_cache[color] = set(self._legal_cache[color])
+                new_b._dirty[color] = set(self._dirty[color])
         return new_b
 
+    # ---------- tuần tự hóa gọn ----------
+    def serialize(self) -> bytes:
+        """
+        Dạng nhị phân gọn để gửi thế cờ sang tiến trình khác: 1 byte kích thước,
+        1 byte cờ có history, size*size byte ô (0 trống, 1 đen, 2 trắng),
+        sau đó là các khóa history dạng uint64.
+        """
+        cells = bytes(cell % 3 for row in self.grid for cell in row)
+        header = bytes((self.size, 0 if self.history is None else 1))
+        if not self.history:
+            return header + cells
+        return header + cells + array("Q", sorted(self.history)).tobytes()
+
+    @classmethod
+    def deserialize(cls, data: bytes) -> "Board":
+        size = data[0]
+        end = 2 + size * size
+        cells = [cell if cell < 2 else WHITE for cell in data[2:end]]
+        board = cls(size)
+        board.load_grid([cells[i * size:(i + 1) * size] for i in range(size)])
+        if data[1]:
+            keys = array("Q")
+            keys.frombytes(data[end:])
+            board.history = set(keys)
+        return board
+
+    def load_grid(self, grid: List[List[int]]):
+        """Nạp một thế cờ bất kỳ, dựng lại chuỗi, khí và khóa Zobrist từ lưới."""
+        size = self.size
+        self.grid = [list(row) for row in grid]
+        self.chain_at = [[None for _ in range(size)] for _ in range(size)]
+        self.chains = set()
+        self.undo_stack = []
+        self._legal_cache = {BLACK: None, WHITE: None}
+        self._dirty = {BLACK: set(), WHITE: set()}
+        self.hash = 0
+        self.patterns = [row[:] for row in pattern_tables(size)[0]]
+        self.influence = [0] * (size * size)
+        for x in range(size):
+            for y in range(size):
+                if self.grid[x][y] != EMPTY:
+                    self._update_patterns(x, y, self.grid[x][y])
+                    self._update_influence(x, y, self.grid[x][y])
+        for x in range(size):
+            for y in range(size):
+                color = self.grid[x][y]
+                if color == EMPTY or self.chain_at[x][y] is not None:
+                    continue
+                stones = {(x, y)}
+                liberties = set()
+                key = 0
+                queue = [(x, y)]
+                for cx, cy in queue:
+                    key ^= self.zobrist[color][cx][cy]
+                    for nx, ny in self.neighbors(cx, cy):
+                        cell = self.grid[nx][ny]
+                        if cell == EMPTY:
+                            liberties.add((nx, ny))
+                        elif cell == color and (nx, ny) not in stones:
+                            stones.add((nx, ny))
+                            queue.append((nx, ny))
+                chain = Chain(color, stones, liberties, key)
+                self.chains.add(chain)
+                self.hash ^= key
+                for sx, sy in stones:
+                    self.chain_at[sx][sy] = chain
+
+    def _update_patterns(self, x: int, y: int, change: int):
+        """Ô (x, y) đổi giữa trống và màu change (đặt hoặc nhấc quân): sửa mã mẫu của 8 ô quanh nó."""
+        delta = change % 3
+        patterns = self.patterns
+        for qx, qy, shift in self._pattern_watchers[x][y]:
+            patterns[qx][qy] ^= delta << shift
+
+    def _update_influence(self, x: int, y: int, delta: int):
+        """delta = màu quân vừa đặt tại (x, y), hoặc -màu khi nhấc quân đó ra."""
+        influence = self.influence
+        for j, w in self._influence_kernel[x * self.size + y]:
+            influence[j] += delta * w
+
+    def pattern_code(self, x: int, y: int) -> int:
+        """Mã mẫu 3x3 quanh (x, y), xem PATTERN_DIRS."""
+        return self.patterns[x][y]
+
+    def _mark_dirty(self, points):
+        """Đánh dấu các điểm có thể đổi tính hợp lệ sau một thay đổi cục bộ."""
+        for color in (BLACK, WHITE):
+            if self._legal_cache[color] is not None:
+                self._dirty[color].update(points)
+
     # ---------- nhóm quân + khí ----------
     def get_group_and_liberties(self, x: int, y: int) -> Tuple[Set[Tuple[int, int]], Set[Tuple[int, int]]]:
-        color = self.grid[x][y]
-        if color == EMPTY:
+        """
+        Trả về (quân, khí) của chuỗi chứa (x, y) trong O(1).
+        Hai tập trả về là dữ liệu nội bộ của Board, không được sửa trực tiếp.
+        """
+        chain = self.chain_at[x][y]
+        if chain is None:
             return set(), set()
+        return chain.stones, chain.liberties
 
-        visited = set()
-        liberties = set()
-        queue = deque([(x, y)])
-        visited.add((x, y))
-
-        while queue:
-            cx, cy = queue.popleft()
-            for nx, ny in self.neighbors(cx, cy):
-                if self.grid[nx][ny] == EMPTY:
-                    liberties.add((nx, ny))
-                elif self.grid[nx][ny] == color and (nx, ny) not in visited:
-                    visited.add((nx, ny))
-                    queue.append((nx, ny))
-        return visited, liberties
+    def iter_chains(self):
+        """Danh sách (màu, quân, khí) của mọi chuỗi trên bàn (các tập không được sửa)."""
+        return [(chain.color, chain.stones, chain.liberties) for chain in self.chains]
 
     def remove_group(self, group: Set[Tuple[int, int]]):
+        """group phải là một chuỗi hoàn chỉnh (lấy từ get_group_and_liberties)."""
         for x, y in group:
+            self.hash ^= self.zobrist[self.grid[x][y]][x][y]
+            self._update_patterns(x, y, self.grid[x][y])
+            self._update_influence(x, y, -self.grid[x][y])
             self.grid[x][y] = EMPTY
+            self.chains.discard(self.chain_at[x][y])
+            self.chain_at[x][y] = None
+        # điểm vừa trống trở thành khí của các chuỗi kề bên
+        gained = set()
+        for x, y in group:
+            for nx, ny in self.neighbors(x, y):
+                chain = self.chain_at[nx][ny]
+                if chain is not None:
+                    chain.liberties.add((x, y))
+                    gained.add(chain)
+        self._mark_dirty(group)
+        for chain in gained:
+            self._mark_dirty(chain.liberties)
 
     # ---------- thực hiện nước đi ----------
     def is_empty(self, x: int, y: int) -> bool:
         return self.grid[x][y] == EMPTY
 
-    def apply_move(self, x: int, y: int, color: int) -> bool:
-        if not self.in_bounds(x, y) or not self.is_empty(x, y):
+    def is_legal(self, x: int, y: int, color: int) -> bool:
+        """
+        Kiểm tra hợp lệ chỉ từ các điểm kề, không cần thử đặt quân:
+        hợp lệ nếu có khí trống kề bên, bắt được một chuỗi đối thủ,
+        hoặc nối vào chuỗi bạn còn khí khác ngoài điểm này;
+        đồng thời không được lặp lại thế cờ cũ (superko).
+        """
+        return self._is_legal_here(x, y, color) and not self.repeats_position(x, y, color)
+
+    def repeats_position(self, x: int, y: int, color: int) -> bool:
+        """Nước đi có tạo lại một thế cờ trong history không (tính bằng khóa Zobrist, O(1))."""
+        if not self.history:
             return False
+        key = self.hash ^ self.zobrist[color][x][y]
+        captured = []
+        for nx, ny in self.neighbors(x, y):
+            chain = self.chain_at[nx][ny]
+            if chain is not None and chain.color != color and len(chain.liberties) == 1 \
+                    and chain not in captured:
+                captured.append(chain)
+                key ^= chain.key
+        return key in self.history
 
-        # Đặt quân tạm
-        self.grid[x][y] = color
-        opponent = -color  # BLACK = -1, WHITE = 1 → -color là đối thủ
+    def _is_legal_here(self, x: int, y: int, color: int) -> bool:
+        if self.grid[x][y] != EMPTY:
+            return False
+        for nx, ny in self.neighbors(x, y):
+            cell = self.grid[nx][ny]
+            if cell == EMPTY:
+                return True
+            libs = len(self.chain_at[nx][ny].liberties)
+            if cell == color:
+                if libs > 1:
+                    return True
+            elif libs == 1:
+                return True
+        return False
+
+    def apply_move(self, x: int, y: int, color: int) -> bool:
+        return self._place(x, y, color) is not None
+
+    def _place(self, x: int, y: int, color: int):
+        """
+        Đặt quân và trả về bản ghi undo, hoặc None nếu nước đi không hợp lệ
+        (khi đó bàn cờ không bị thay đổi).
+        """
+        if not self.in_bounds(x, y) or not self.is_empty(x, y):
+            return None
 
-        captured_groups = []
+        point = (x, y)
 
-        # Kiểm tra các nhóm đối thủ xung quanh
+        # Phân loại các điểm kề: khí trống, chuỗi bạn, chuỗi đối thủ
+        empties = []
+        friends = []
+        enemies = []
         for nx, ny in self.neighbors(x, y):
-            if self.grid[nx][ny] == opponent:
-                group, libs = self.get_group_and_liberties(nx, ny)
-                if len(libs) == 0 and group not in captured_groups:
-                    captured_groups.append(group)
+            cell = self.grid[nx][ny]
+            if cell == EMPTY:
+                empties.append((nx, ny))
+                continue
+            chain = self.chain_at[nx][ny]
+            bucket = friends if cell == color else enemies
+            if chain not in bucket:
+                bucket.append(chain)
+
+        # Chuỗi đối thủ chỉ còn đúng 1 khí (chính là điểm này) sẽ bị bắt
+        captured_groups = [chain for chain in enemies if len(chain.liberties) == 1]
+
+        # Kiểm tra tự sát trước khi đặt: không khí trống, không bắt được quân
+        # và mọi chuỗi bạn kề bên đều chỉ còn khí duy nhất là điểm này
+        if not empties and not captured_groups and all(len(c.liberties) == 1 for c in friends):
+            return None
+
+        # Superko: khóa của thế cờ mới tính trước từ khóa các chuỗi bị bắt
+        stone_key = self.zobrist[color][x][y]
+        if self.history is not None:
+            new_hash = self.hash ^ stone_key
+            for chain in captured_groups:
+                new_hash ^= chain.key
+            if new_hash in self.history:
+                return None
+        prev_hash = self.hash
+
+        # Đặt quân và gộp với các chuỗi bạn kề bên
+        self.grid[x][y] = color
+        self._update_patterns(x, y, color)
+        self._update_influence(x, y, color)
+        self.hash ^= stone_key
+        stones = {point}
+        liberties = set(empties)
+        key = stone_key
+        for chain in friends:
+            stones |= chain.stones
+            liberties |= chain.liberties
+            key ^= chain.key
+            self.chains.discard(chain)
+        liberties.discard(point)
+        new_chain = Chain(color, stones, liberties, key)
+        self.chains.add(new_chain)
+        for sx, sy in stones:
+            self.chain_at[sx][sy] = new_chain
+
+        # Chuỗi đối thủ kề bên mất khí tại điểm này
+        for chain in enemies:
+            chain.liberties.discard(point)
+            self._mark_dirty(chain.liberties)
+        self._mark_dirty(empties)
+        self._mark_dirty(liberties)
+        self._mark_dirty((point,))
 
         # Bắt quân đối thủ
-        for group in captured_groups:
-            self.remove_group(group)
+        for chain in captured_groups:
+            self.remove_group(chain.stones)
 
-        # Kiểm tra tự sát
-        my_group, my_libs = self.get_group_and_liberties(x, y)
-        if len(my_libs) == 0 and not captured_groups:  # chỉ tự sát nếu không bắt được quân nào
-            # Undo: bỏ quân vừa đặt và phục hồi nhóm bị bắt (nếu có)
-            self.grid[x][y] = EMPTY
-            for group in captured_groups:
-                for gx, gy in group:
-                    self.grid[gx][gy] = opponent
-            return False
+        if self.history is not None:
+            self.history.add(self.hash)
+
+        return point, friends, new_chain, enemies, captured_groups, prev_hash
 
+    # ---------- make / unmake cho tìm kiếm ----------
+    def play(self, x: int, y: int, color: int) -> bool:
+        """Giống apply_move nhưng ghi lại nước đi để undo() có thể hoàn tác."""
+        record = self._place(x, y, color)
+        if record is None:
+            return False
+        self.undo_stack.append(record)
         return True
 
+    def undo(self):
+        """Hoàn tác nước đi gần nhất được thực hiện bằng play()."""
+        point, friends, new_chain, enemies, captured_groups, prev_hash = self.undo_stack.pop()
+        if self.history is not None:
+            self.history.discard(self.hash)
+        self.hash = prev_hash
+
+        # 1. Trả lại các chuỗi bị bắt, thu hồi khí mà chúng đã nhường cho bên đi
+        for chain in captured_groups:
+            self.chains.add(chain)
+            for sx, sy in chain.stones:
+                self.grid[sx][sy] = chain.color
+                self._update_patterns(sx, sy, chain.color)
+                self._update_influence(sx, sy, chain.color)
+                self.chain_at[sx][sy] = chain
+        for chain in captured_groups:
+            self._mark_dirty(chain.stones)
+            for sx, sy in chain.stones:
+                for nx, ny in self.neighbors(sx, sy):
+                    other = self.chain_at[nx][ny]
+                    if other is not None and other.color != chain.color:
+                        other.liberties.discard((sx, sy))
+                        self._mark_dirty(other.liberties)
+
+        # 2. Bỏ quân vừa đặt và khôi phục các chuỗi bạn trước khi gộp
+        x, y = point
+        self._update_patterns(x, y, self.grid[x][y])
+        self._update_influence(x, y, -self.grid[x][y])
+        self.grid[x][y] = EMPTY
+        self.chain_at[x][y] = None
+        self.chains.discard(new_chain)
+        for chain in friends:
+            self.chains.add(chain)
+            for sx, sy in chain.stones:
+                self.chain_at[sx][sy] = chain
+            self._mark_dirty(chain.liberties)
+        self._mark_dirty(self.neighbors(x, y))
+        self._mark_dirty((point,))
+
+        # 3. Các chuỗi đối thủ kề bên (kể cả chuỗi vừa trả lại) lấy lại khí
+        for chain in enemies:
+            chain.liberties.add(point)
+            self._mark_dirty(chain.liberties)
+
     # ---------- danh sách nước hợp lệ ----------
     def legal_moves(self, color: int) -> List[Tuple[int, int]]:
-        moves = []
-        for i in range(self.size):
-            for j in range(self.size):
-                if self.grid[i][j] == EMPTY:
-                    # Tạo bản sao tạm để thử đặt
-                    temp = self.copy()
-                    if temp.apply_move(i, j, color):
-                        moves.append((i, j))
-        return moves
+        """
+        Danh sách nước hợp lệ theo thứ tự hàng-cột. Tập nước hợp lệ được giữ
+        trong cache và chỉ kiểm tra lại các điểm gần chỗ vừa thay đổi.
+        """
+        cache = self._legal_cache[color]
+        dirty = self._dirty[color]
+        if cache is None:
+            cache = {
+                (i, j)
+                for i in range(self.size)
+                for j in range(self.size)
+                if self._is_legal_here(i, j, color)
+            }
+            self._legal_cache[color] = cache
+        else:
+            for i, j in dirty:
+                if self._is_legal_here(i, j, color):
+                    cache.add((i, j))
+                else:
+                    cache.discard((i, j))
+        dirty.clear()
+        if self.history:
+            return [p for p in sorted(cache) if not self.repeats_position(p[0], p[1], color)]
+        return sorted(cache)
 
     # ---------- đếm quân ----------
     def count_stones(self, color: int = None) -> int | Tuple[int, int]:
@@ -116,71 +529,107 @@ class Board:
 
     # ---------- tổng số khí ----------
     def count_total_liberties(self, color: int) -> int:
-        total = 0
-        seen = set()
-        for i in range(self.size):
-            for j in range(self.size):
-                if self.grid[i][j] == color and (i, j) not in seen:
-                    group, liberties = self.get_group_and_liberties(i, j)
-                    seen.update(group)
-                    total += len(liberties)
-        return total
+        return sum(len(chain.liberties) for chain in self.chains if chain.color == color)
 
     # ---------- ước lượng lãnh thổ ----------
+    def influence_territory(self) -> Tuple[int, int]:
+        """
+        (đen, trắng): số ô trống có ảnh hưởng nghiêng hẳn về một màu
+        (|ảnh hưởng| >= INFLUENCE_THRESHOLD). Chỉ duyệt một lượt, không loang vùng.
+        """
+        influence = self.influence
+        black_terr = white_terr = 0
+        i = 0
+        for row in self.grid:
+            for cell in row:
+                if cell == EMPTY:
+                    value = influence[i]
+                    if value >= INFLUENCE_THRESHOLD:
+                        black_terr += 1
+                    elif value <= -INFLUENCE_THRESHOLD:
+                        white_terr += 1
+                i += 1
+        return black_terr, white_terr
+
+    def ownership(self, x: int, y: int) -> int:
+        """Màu đang kiểm soát điểm (x, y) theo bản đồ ảnh hưởng, EMPTY nếu còn tranh chấp."""
+        value = self.influence[x * self.size + y]
+        if value >= INFLUENCE_THRESHOLD:
+            return BLACK
+        if value <= -INFLUENCE_THRESHOLD:
+            return WHITE
+        return EMPTY
+
+    def contested_points(self) -> int:
+        """Số ô trống chưa nghiêng về màu nào (còn đáng để đi)."""
+        black_terr, white_terr = self.influence_territory()
+        empty = sum(row.count(EMPTY) for row in self.grid)
+        return empty - black_terr - white_terr
+
     def estimate_territory(self) -> Tuple[int, int]:
+        """Loang các vùng trống: vùng chỉ chạm một màu là lãnh thổ của màu đó, còn lại là dame."""
+        grid, adj = self.grid, self.adj
         visited = [[False] * self.size for _ in range(self.size)]
         black_terr = white_terr = 0
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-
-        def flood_fill(r: int, c: int) -> Tuple[set, int]:
-            if visited[r][c] or self.grid[r][c] != EMPTY:
-                return set(), 0
-            queue = [(r, c)]
-            visited[r][c] = True
-            area = 0
-            borders = set()
-
-            while queue:
-                x, y = queue.pop(0)
-                area += 1
-                for dx, dy in directions:
-                    nx, ny = x + dx, y + dy
-                    if 0 <= nx < self.size and 0 <= ny < self.size:
-                        cell = self.grid[nx][ny]
-                        if cell != EMPTY:
-                            borders.add(cell)
-                        elif not visited[nx][ny]:
-                            visited[nx][ny] = True
-                            queue.append((nx, ny))
-            return borders, area
 
         for i in range(self.size):
             for j in range(self.size):
-                if not visited[i][j] and self.grid[i][j] == EMPTY:
-                    borders, size = flood_fill(i, j)
-                    if len(borders) == 1:
-                        owner = next(iter(borders))
-                        if owner == BLACK:
-                            black_terr += size
-                        elif owner == WHITE:
-                            white_terr += size
+                if visited[i][j] or grid[i][j] != EMPTY:
+                    continue
+                # loang vùng trống; borders: bit 1 chạm quân đen, bit 2 chạm quân trắng
+                visited[i][j] = True
+                region = [(i, j)]
+                borders = 0
+                for x, y in region:
+                    for nx, ny in adj[x][y]:
+                        cell = grid[nx][ny]
+                        if cell == EMPTY:
+                            if not visited[nx][ny]:
+                                visited[nx][ny] = True
+                                region.append((nx, ny))
+                        else:
+                            borders |= 1 if cell == BLACK else 2
+                if borders == 1:
+                    black_terr += len(region)
+                elif borders == 2:
+                    white_terr += len(region)
         return black_terr, white_terr
-    
+
+    def final_score(self, komi: float = KOMI) -> Tuple[float, float]:
+        """Điểm cuối ván theo luật Trung Quốc: quân trên bàn + lãnh thổ, trắng được komi."""
+        black_stones, white_stones = self.count_stones()
+        # chỉ tính vùng trống bị một màu bao quanh; bản đồ ảnh hưởng chỉ dùng cho heuristic
+        black_terr, white_terr = self.estimate_territory()
+        return black_stones + black_terr, white_stones + white_terr + komi
+
+    # ---------- đặc trưng cho heuristic ----------
+    def extract_features(self) -> BoardFeatures:
+        """
+        Số quân, tổng khí, số chuỗi bị đe dọa và lãnh thổ của cả hai màu:
+        phần chuỗi đọc thẳng từ các Chain đang có, lãnh thổ lấy từ bản đồ ảnh hưởng.
+        """
+        f = BoardFeatures()
+        for chain in self.chains:
+            libs = len(chain.liberties)
+            if chain.color == BLACK:
+                f.black_stones += len(chain.stones)
+                f.black_liberties += libs
+                if libs <= 2:
+                    f.black_threatened += 1
+            else:
+                f.white_stones += len(chain.stones)
+                f.white_liberties += libs
+                if libs <= 2:
+                    f.white_threatened += 1
+        f.black_territory, f.white_territory = self.influence_territory()
+        return f
+
     def count_threatened_groups(self, color: int) -> int:
         """
         Đếm số nhóm của color có <= 2 liberties (dễ bị ăn = atari hoặc gần chết)
         Rất quan trọng để AI biết cứu quân hoặc tấn công!
         """
-        threatened = 0
-        seen = set()
-        for i in range(self.size):
-            for j in range(self.size):
-                if self.grid[i][j] == color and (i, j) not in seen:
-                    group, liberties = self.get_group_and_liberties(i, j)
-                    seen.update(group)
-                    if len(liberties) <= 2:  # <= 2 là nguy hiểm
-                        threatened += 1
-        return threatened
+        return sum(1 for chain in self.chains if chain.color == color and len(chain.liberties) <= 2)
 
     # ---------- tạm thời để heuristic không crash ----------
     def is_game_over(self) -> bool:
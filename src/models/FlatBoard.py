@@ -0,0 +1,412 @@
+# models/FlatBoard.py
+
+from array import array
+from typing import Set, Tuple, List, Optional
+from .Board import (
+    Board, BoardFeatures, zobrist_table, neighbor_table, influence_table,
+    PATTERN_DIRS, INFLUENCE_THRESHOLD,
+)
+from .GameState import BOARD_SIZE, EMPTY, BLACK, WHITE
+
+BORDER = 2  # giá trị lính canh ở viền ngoài bàn cờ
+
+# giá trị ô -> trường 2 bit của mã mẫu (chỉ số cell + 1: trắng, trống, đen, viền)
+_PATTERN_FIELD = (2, 0, 1, 3)
+
+# Bảng tra dùng chung theo kích thước bàn: (chỉ số các ô trên bàn, độ lệch 4 hướng)
+_TABLES = {}
+
+
+def _tables(size: int):
+    if size not in _TABLES:
+        width = size + 2
+        points = [(x + 1) * width + (y + 1) for x in range(size) for y in range(size)]
+        offsets = (-width, width, -1, 1)
+        # cùng bảng Zobrist với Board, đánh chỉ số theo ô 1 chiều
+        zobrist = {}
+        for color, table in zobrist_table(size).items():
+            flat = [0] * (width * width)
+            for x in range(size):
+                for y in range(size):
+                    flat[(x + 1) * width + (y + 1)] = table[x][y]
+            zobrist[color] = flat
+        pattern_offsets = tuple(dx * width + dy for dx, dy in PATTERN_DIRS)
+        # điểm chịu ảnh hưởng của mỗi ô (cùng bảng với Board, đánh chỉ số 1 chiều)
+        kernel = [()] * (width * width)
+        for x, row in enumerate(influence_table(size)):
+            for y, cell in enumerate(row):
+                kernel[(x + 1) * width + (y + 1)] = tuple(
+                    ((qx + 1) * width + (qy + 1), w) for qx, qy, w in cell
+                )
+        _TABLES[size] = (points, offsets, zobrist, pattern_offsets, kernel)
+    return _TABLES[size]
+
+
+class FlatBoard(Board):
+    """
+    Backend lưu trữ gọn của Board: lưới 1 chiều (size + 2)^2 ô kiểu array('b'),
+    có viền lính canh nên duyệt hàng xóm chỉ cần cộng độ lệch cố định,
+    không phải kiểm tra in_bounds. Một thế cờ 9x9 chỉ tốn 121 byte.
+    Giữ nguyên API công khai của Board để controller và UI dùng như cũ.
+    Không giữ chuỗi / khí / cache nước hợp lệ: copy() và phát lại nước đi (replay.py)
+    nhanh hơn Board, nhưng hợp lệ, chuỗi và đặc trưng phải loang lại mỗi lần hỏi nên
+    tìm kiếm (minimax, MCTS) chậm hơn Board. Dùng để lưu / sao chép / phát lại thế cờ,
+    không dùng cho AI.
+    """
+
+    def __init__(self, size: int = BOARD_SIZE):
+        self.size = size
+        self.width = size + 2
+        self.points, self.offsets, self.zobrist, self.pattern_offsets, self.kernel = _tables(size)
+        self.adj = neighbor_table(size)
+        self.cells = array("b", [BORDER]) * (self.width * self.width)
+        for i in self.points:
+            self.cells[i] = EMPTY
+        self.undo_stack: List[tuple] = []
+        self._grid_view = None
+        self.hash = 0
+        self.history: Optional[Set[int]] = None
+        self.influence = [0] * (self.width * self.width)
+
+    # ---------- chuyển đổi tọa độ ----------
+    def index(self, x: int, y: int) -> int:
+        return (x + 1) * self.width + (y + 1)
+
+    def coord(self, i: int) -> Tuple[int, int]:
+        x, y = divmod(i, self.width)
+        return x - 1, y - 1
+
+    @property
+    def grid(self) -> List[List[int]]:
+        # Dạng lưới 2 chiều chỉ để đọc (UI, heuristic); dựng lại khi bàn cờ đổi
+        if self._grid_view is None:
+            cells, w = self.cells, self.width
+            self._grid_view = [
+                list(cells[(x + 1) * w + 1:(x + 1) * w + 1 + self.size])
+                for x in range(self.size)
+            ]
+        return self._grid_view
+
+    def copy(self) -> "FlatBoard":
+        new_b = FlatBoard.__new__(FlatBoard)
+        new_b.size = self.size
+        new_b.width = self.width
+        new_b.points, new_b.offsets, new_b.zobrist = self.points, self.offsets, self.zobrist
+        new_b.pattern_offsets, new_b.kernel = self.pattern_offsets, self.kernel
+        new_b.influence = self.influence[:]
+        new_b.adj = self.adj
+        new_b.cells = array("b", self.cells)
+        new_b.undo_stack = []
+        new_b._grid_view = None
+        new_b.hash = self.hash
+        new_b.history = set(self.history) if self.history is not None else None
+        return new_b
+
+    def load_grid(self, grid: List[List[int]]):
+        cells = self.cells
+        self.hash = 0
+        self.influence = [0] * len(cells)
+        for x in range(self.size):
+            for y in range(self.size):
+                i = self.index(x, y)
+                cells[i] = grid[x][y]
+                if grid[x][y] != EMPTY:
+                    self.hash ^= self.zobrist[grid[x][y]][i]
+                    self._update_influence(i, grid[x][y])
+        self.undo_stack = []
+        self._grid_view = None
+
+    def _update_influence(self, i: int, delta: int):
+        influence = self.influence
+        for j, w in self.kernel[i]:
+            influence[j] += delta * w
+
+    def pattern_code(self, x: int, y: int) -> int:
+        # Lưới có viền nên đọc thẳng 8 ô quanh điểm, không cần giữ mảng mã riêng
+        cells = self.cells
+        i = self.index(x, y)
+        code = 0
+        for k, d in enumerate(self.pattern_offsets):
+            code |= _PATTERN_FIELD[cells[i + d] + 1] << (2 * k)
+        return code
+
+    # ---------- nhóm quân + khí ----------
+    def _chain(self, start: int) -> Tuple[List[int], Set[int]]:
+        cells, offsets = self.cells, self.offsets
+        color = cells[start]
+        stones = [start]
+        seen = {start}
+        liberties = set()
+        for i in stones:
+            for d in offsets:
+                n = i + d
+                cell = cells[n]
+                if cell == EMPTY:
+                    liberties.add(n)
+                elif cell == color and n not in seen:
+                    seen.add(n)
+                    stones.append(n)
+        return stones, liberties
+
+    def _has_liberty_besides(self, start: int, point: int) -> bool:
+        # Duyệt chuỗi chứa start, dừng ngay khi gặp một khí khác point
+        cells, offsets = self.cells, self.offsets
+        color = cells[start]
+        stack = [start]
+        seen = {start}
+        while stack:
+            i = stack.pop()
+            for d in offsets:
+                n = i + d
+                cell = cells[n]
+                if cell == EMPTY:
+                    if n != point:
+                        return True
+                elif cell == color and n not in seen:
+                    seen.add(n)
+                    stack.append(n)
+        return False
+
+    def get_group_and_liberties(self, x: int, y: int) -> Tuple[Set[Tuple[int, int]], Set[Tuple[int, int]]]:
+        start = self.index(x, y)
+        if self.cells[start] == EMPTY:
+            return set(), set()
+        stones, liberties = self._chain(start)
+        return {self.coord(i) for i in stones}, {self.coord(i) for i in liberties}
+
+    def iter_chains(self):
+        coord = self.coord
+        return [
+            (color, {coord(i) for i in stones}, {coord(i) for i in liberties})
+            for color in (BLACK, WHITE)
+            for stones, liberties in self._chains_of(color)
+        ]
+
+    def remove_group(self, group: Set[Tuple[int, int]]):
+        for x, y in group:
+            i = self.index(x, y)
+            self.hash ^= self.zobrist[self.cells[i]][i]
+            self._update_influence(i, -self.cells[i])
+            self.cells[i] = EMPTY
+        self._grid_view = None
+
+    # ---------- thực hiện nước đi ----------
+    def is_empty(self, x: int, y: int) -> bool:
+        return self.cells[self.index(x, y)] == EMPTY
+
+    def is_legal(self, x: int, y: int, color: int) -> bool:
+        i = self.index(x, y)
+        cells = self.cells
+        if not self.in_bounds(x, y) or cells[i] != EMPTY:
+            return False
+        for d in self.offsets:
+            n = i + d
+            cell = cells[n]
+            if cell == EMPTY:
+                return not self.repeats_position(x, y, color)
+            if cell == BORDER:
+                continue
+            has_other = self._has_liberty_besides(n, i)
+            if (cell == color) == has_other:
+                return not self.repeats_position(x, y, color)
+        return False
+
+    def repeats_position(self, x: int, y: int, color: int) -> bool:
+        if not self.history:
+            return False
+        i = self.index(x, y)
+        cells = self.cells
+        opponent_keys = self.zobrist[-color]
+        key = self.hash ^ self.zobrist[color][i]
+        captured = set()
+        for d in self.offsets:
+            n = i + d
+            if cells[n] == -color and n not in captured and not self._has_liberty_besides(n, i):
+                stones, _ = self._chain(n)
+                captured.update(stones)
+        for n in captured:
+            key ^= opponent_keys[n]
+        return key in self.history
+
+    def _place(self, x: int, y: int, color: int):
+        if not self.in_bounds(x, y):
+            return None
+        i = self.index(x, y)
+        cells = self.cells
+        if cells[i] != EMPTY:
+            return None
+
+        cells[i] = color
+        opponent = -color
+        captured = []
+        for d in self.offsets:
+            n = i + d
+            if cells[n] == opponent and n not in captured:
+                stones, liberties = self._chain(n)
+                if not liberties:
+                    captured.extend(stones)
+        for n in captured:
+            cells[n] = EMPTY
+
+        # Tự sát: không bắt được quân và chuỗi vừa đặt hết khí
+        if not captured and not self._has_liberty_besides(i, -1):
+            cells[i] = EMPTY
+            return None
+
+        opponent_keys = self.zobrist[opponent]
+        new_hash = self.hash ^ self.zobrist[color][i]
+        for n in captured:
+            new_hash ^= opponent_keys[n]
+        # Superko: hoàn tác nếu thế cờ mới đã từng xuất hiện
+        if self.history is not None:
+            if new_hash in self.history:
+                cells[i] = EMPTY
+                for n in captured:
+                    cells[n] = opponent
+                return None
+            self.history.add(new_hash)
+
+        prev_hash = self.hash
+        self.hash = new_hash
+        self._update_influence(i, color)
+        for n in captured:
+            self._update_influence(n, -opponent)
+        self._grid_view = None
+        return i, captured, prev_hash
+
+    def undo(self):
+        i, captured, prev_hash = self.undo_stack.pop()
+        cells = self.cells
+        opponent = -cells[i]
+        self._update_influence(i, opponent)
+        cells[i] = EMPTY
+        for n in captured:
+            cells[n] = opponent
+            self._update_influence(n, opponent)
+        if self.history is not None:
+            self.history.discard(self.hash)
+        self.hash = prev_hash
+        self._grid_view = None
+
+    # ---------- danh sách nước hợp lệ ----------
+    def legal_moves(self, color: int) -> List[Tuple[int, int]]:
+        cells = self.cells
+        moves = []
+        for i in self.points:
+            if cells[i] == EMPTY:
+                x, y = self.coord(i)
+                if self.is_legal(x, y, color):
+                    moves.append((x, y))
+        return moves
+
+    # ---------- đếm quân ----------
+    def count_stones(self, color: int = None) -> int | Tuple[int, int]:
+        # Viền là BORDER nên đếm thẳng trên cả mảng
+        if color == BLACK:
+            return self.cells.count(BLACK)
+        if color == WHITE:
+            return self.cells.count(WHITE)
+        return self.cells.count(BLACK), self.cells.count(WHITE)
+
+    def _chains_of(self, color: int):
+        seen = set()
+        cells = self.cells
+        for i in self.points:
+            if cells[i] == color and i not in seen:
+                stones, liberties = self._chain(i)
+                seen.update(stones)
+                yield stones, liberties
+
+    def count_total_liberties(self, color: int) -> int:
+        return sum(len(liberties) for _, liberties in self._chains_of(color))
+
+    def count_threatened_groups(self, color: int) -> int:
+        return sum(1 for _, liberties in self._chains_of(color) if len(liberties) <= 2)
+
+    # ---------- ước lượng lãnh thổ ----------
+    def influence_territory(self) -> Tuple[int, int]:
+        influence, cells = self.influence, self.cells
+        black_terr = white_terr = 0
+        for i in self.points:
+            if cells[i] == EMPTY:
+                value = influence[i]
+                if value >= INFLUENCE_THRESHOLD:
+                    black_terr += 1
+                elif value <= -INFLUENCE_THRESHOLD:
+                    white_terr += 1
+        return black_terr, white_terr
+
+    def ownership(self, x: int, y: int) -> int:
+        value = self.influence[self.index(x, y)]
+        if value >= INFLUENCE_THRESHOLD:
+            return BLACK
+        if value <= -INFLUENCE_THRESHOLD:
+            return WHITE
+        return EMPTY
+
+    def contested_points(self) -> int:
+        black_terr, white_terr = self.influence_territory()
+        return self.cells.count(EMPTY) - black_terr - white_terr
+
+    def estimate_territory(self) -> Tuple[int, int]:
+        cells, offsets = self.cells, self.offsets
+        visited = bytearray(len(cells))
+        black_terr = white_terr = 0
+        for start in self.points:
+            if visited[start] or cells[start] != EMPTY:
+                continue
+            visited[start] = 1
+            region = [start]
+            borders = 0  # bit 1: chạm quân đen, bit 2: chạm quân trắng
+            for i in region:
+                for d in offsets:
+                    n = i + d
+                    cell = cells[n]
+                    if cell == EMPTY:
+                        if not visited[n]:
+                            visited[n] = 1
+                            region.append(n)
+                    elif cell == BLACK:
+                        borders |= 1
+                    elif cell == WHITE:
+                        borders |= 2
+            if borders == 1:
+                black_terr += len(region)
+            elif borders == 2:
+                white_terr += len(region)
+        return black_terr, white_terr
+
+    # ---------- đặc trưng cho heuristic ----------
+    def extract_features(self) -> BoardFeatures:
+        # Một vòng duyệt các ô: gặp quân thì loang chuỗi, ô trống đọc thẳng bản đồ ảnh hưởng
+        cells, influence = self.cells, self.influence
+        seen = bytearray(len(cells))
+        f = BoardFeatures()
+        for start in self.points:
+            cell = cells[start]
+            if cell == EMPTY:
+                value = influence[start]
+                if value >= INFLUENCE_THRESHOLD:
+                    f.black_territory += 1
+                elif value <= -INFLUENCE_THRESHOLD:
+                    f.white_territory += 1
+                continue
+            if seen[start]:
+                continue
+            stones, liberties = self._chain(start)
+            for i in stones:
+                seen[i] = 1
+            libs = len(liberties)
+            if cell == BLACK:
+                f.black_stones += len(stones)
+                f.black_liberties += libs
+                f.black_threatened += libs <= 2
+            else:
+                f.white_stones += len(stones)
+                f.white_liberties += libs
+                f.white_threatened += libs <= 2
+        return f
+
+
+# Backend lưu bàn cờ: "list" (lưới 2 chiều + chuỗi tăng dần) hoặc "flat" (mảng 1 chiều có viền)
+BOARD_BACKENDS = {"list": Board, "flat": FlatBoard}
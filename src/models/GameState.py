@@ -1,6 +1,6 @@
 # models/GameState.py
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 BOARD_SIZE = 9
 EMPTY = 0
@@ -12,6 +12,12 @@ class GameState:
     board: "Board"
     current_player: int = BLACK
     consecutive_passes: int = 0   # THÊM DÒNG NÀY
+    # khóa Zobrist của mọi thế cờ đã xuất hiện → Board từ chối nước vi phạm superko
+    history: set = field(default_factory=set)
+
+    def __post_init__(self):
+        self.history.add(self.board.hash)
+        self.board.history = self.history
 
     def switch_player(self):
         self.current_player = BLACK if self.current_player == WHITE else WHITE
@@ -0,0 +1,230 @@
+# models/Sgf.py
+
+import gzip
+import re
+import time
+from dataclasses import dataclass, field
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+from .Board import Board, KOMI
+from .GameState import BOARD_SIZE, BLACK, WHITE, EMPTY
+
+CHUNK_SIZE = 1 << 16   # số ký tự đọc mỗi lần khi duyệt file SGF
+MAX_SIZE = 25          # tọa độ SGF chữ thường đủ tới 26; giới hạn như GTP
+
+Move = Tuple[int, Optional[Tuple[int, int]]]   # (màu, (hàng, cột) hoặc None = pass)
+
+
+class SgfError(ValueError):
+    """File SGF hỏng hoặc ván cờ có nước đi phạm luật."""
+
+
+@dataclass
+class SgfGame:
+    """Một ván đọc từ SGF (chỉ nhánh chính)."""
+    size: int = BOARD_SIZE
+    komi: float = KOMI
+    black: str = ""
+    white: str = ""
+    result: str = ""
+    setup: List[Move] = field(default_factory=list)   # quân đặt sẵn (AB / AW), ví dụ chấp quân
+    moves: List[Move] = field(default_factory=list)
+
+
+# ----------------- ghi -----------------
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("]", "\\]")
+
+
+def _point(move: Optional[Tuple[int, int]]) -> str:
+    # SGF: chữ đầu là cột, chữ sau là hàng, "aa" ở góc trên bên trái; pass là chuỗi rỗng
+    if move is None:
+        return ""
+    row, col = move
+    return chr(ord("a") + col) + chr(ord("a") + row)
+
+
+def to_sgf(moves: Iterable[Move], size: int = BOARD_SIZE, komi: float = KOMI,
+           result: str = "", black: str = "", white: str = "", date: str = None) -> str:
+    """Ghi một ván thành chuỗi SGF FF[4]."""
+    header = [f"FF[4]GM[1]CA[UTF-8]SZ[{size}]KM[{komi:g}]RU[Chinese]"]
+    if black:
+        header.append(f"PB[{_escape(black)}]")
+    if white:
+        header.append(f"PW[{_escape(white)}]")
+    header.append(f"DT[{date or time.strftime('%Y-%m-%d')}]")
+    if result:
+        header.append(f"RE[{_escape(result)}]")
+    nodes = [";" + "".join(header)]
+    for color, move in moves:
+        nodes.append(f";{'B' if color == BLACK else 'W'}[{_point(move)}]")
+    return "(" + "\n".join(nodes) + ")\n"
+
+
+# ----------------- đọc theo luồng -----------------
+
+def iter_game_texts(source) -> Iterator[str]:
+    """
+    Tách từng cây game cấp cao nhất "( ... )" từ một file SGF (có thể nén .gz) hoặc luồng
+    văn bản đã mở, đọc theo khối CHUNK_SIZE. Bộ nhớ chỉ giữ một ván tại một thời điểm,
+    dù file chứa bao nhiêu ván.
+    """
+    if isinstance(source, str):
+        opener = gzip.open if source.endswith(".gz") else open
+        with opener(source, "rt", encoding="utf-8", errors="replace") as f:
+            yield from iter_game_texts(f)
+        return
+    stream: IO[str] = source
+    depth = 0
+    in_value = escaped = False
+    parts = []
+    start = None
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        start = 0 if depth > 0 else None
+        for i, ch in enumerate(chunk):
+            if in_value:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == "]":
+                    in_value = False
+            elif ch == "[":
+                if depth > 0:
+                    in_value = True
+            elif ch == "(":
+                if depth == 0:
+                    start = i
+                depth += 1
+            elif ch == ")" and depth > 0:
+                depth -= 1
+                if depth == 0:
+                    parts.append(chunk[start:i + 1])
+                    yield "".join(parts)
+                    parts = []
+                    start = None
+        if depth > 0 and start is not None:
+            parts.append(chunk[start:])
+    if depth > 0:
+        raise SgfError("unterminated game tree")
+
+
+# một token SGF: ngoặc / dấu ";" hoặc thuộc tính kèm các giá trị [..] (cho phép \] bên trong)
+_TOKEN = re.compile(r"([();])|([A-Za-z]+)((?:\s*\[(?:[^\]\\]|\\.)*\])+)|(\S)", re.S)
+_VALUE = re.compile(r"\[((?:[^\]\\]|\\.)*)\]", re.S)
+
+
+def _unescape(value: str) -> str:
+    return re.sub(r"\\(.)", r"\1", value, flags=re.S) if "\\" in value else value
+
+
+def _nodes(text: str) -> Iterator[List[Tuple[str, List[str]]]]:
+    """Các node của nhánh chính (nhánh đầu tiên ở mỗi chỗ rẽ), mỗi node là [(tên, [giá trị])]."""
+    depth = 0
+    closed_at = None    # đã đóng nhánh con đầu tiên ở độ sâu này: bỏ qua các nhánh anh em
+    node = None
+    for m in _TOKEN.finditer(text):
+        punct, name, values, other = m.groups()
+        if punct == "(":
+            depth += 1
+        elif punct == ")":
+            if closed_at is None or depth <= closed_at:
+                if node is not None:
+                    yield node
+                    node = None
+                closed_at = depth - 1
+            depth -= 1
+        elif closed_at is not None and depth > closed_at:
+            continue    # bên trong nhánh phụ
+        elif punct == ";":
+            if node is not None:
+                yield node
+            node = []
+        elif name is not None:
+            if node is not None:
+                # FF[3] cho phép chữ thường trong tên thuộc tính (vd. "AddBlack"): chỉ giữ chữ hoa
+                if not name.isupper():
+                    name = "".join(c for c in name if c.isupper())
+                node.append((name, [_unescape(v) for v in _VALUE.findall(values)]))
+        elif other == "[":
+            raise SgfError("unterminated property value")
+    if node is not None:
+        yield node
+
+
+def _parse_point(value: str, size: int) -> Optional[Tuple[int, int]]:
+    if value == "" or (value == "tt" and size <= 19):
+        return None
+    if len(value) != 2:
+        raise SgfError(f"bad point: {value!r}")
+    col, row = ord(value[0]) - ord("a"), ord(value[1]) - ord("a")
+    if not (0 <= row < size and 0 <= col < size):
+        raise SgfError(f"point outside the board: {value!r}")
+    return row, col
+
+
+def parse_game(text: str) -> SgfGame:
+    game = SgfGame()
+    first = True
+    for node in _nodes(text):
+        for name, values in node:
+            if not values:
+                continue
+            if first and name == "SZ":
+                try:
+                    game.size = int(values[0].split(":")[0])
+                except ValueError:
+                    raise SgfError(f"bad board size: {values[0]!r}")
+                if not 2 <= game.size <= MAX_SIZE:
+                    raise SgfError(f"unsupported board size: {game.size}")
+            elif first and name == "KM":
+                try:
+                    game.komi = float(values[0])
+                except ValueError:
+                    pass
+            elif name == "PB":
+                game.black = values[0]
+            elif name == "PW":
+                game.white = values[0]
+            elif name == "RE":
+                game.result = values[0]
+            elif name in ("AB", "AW"):
+                color = BLACK if name == "AB" else WHITE
+                game.setup.extend((color, _parse_point(v, game.size)) for v in values)
+            elif name in ("B", "W"):
+                color = BLACK if name == "B" else WHITE
+                game.moves.append((color, _parse_point(values[0], game.size)))
+        first = False
+    return game
+
+
+def iter_games(source) -> Iterator[SgfGame]:
+    """Đọc lần lượt từng ván (nhánh chính) từ nguồn như iter_game_texts."""
+    for text in iter_game_texts(source):
+        yield parse_game(text)
+
+
+# ----------------- phát lại -----------------
+
+def replay(game: SgfGame, board_cls=Board, superko: bool = True) -> Iterator[Board]:
+    """
+    Phát lại nhánh chính qua Board.apply_move, sinh ra bàn cờ (cùng một đối tượng,
+    đã đổi) sau mỗi nước. Nước phạm luật ném SgfError; superko=False bỏ qua luật
+    superko (ván luật Nhật có thể lặp thế cờ, ví dụ triple ko).
+    """
+    board = board_cls(game.size)
+    if game.setup:
+        grid = [[EMPTY] * game.size for _ in range(game.size)]
+        for color, point in game.setup:
+            if point is not None:
+                grid[point[0]][point[1]] = color
+        board.load_grid(grid)
+    if superko:
+        board.history = {board.hash}
+    for number, (color, move) in enumerate(game.moves, 1):
+        if move is not None and not board.apply_move(move[0], move[1], color):
+            raise SgfError(f"illegal move {number}: {'B' if color == BLACK else 'W'} {_point(move)}")
+        yield board
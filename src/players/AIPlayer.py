@@ -1,13 +1,55 @@
 # players/AIPlayer.py
 
+import json
+import logging
 from typing import Optional, Tuple
 from models.GameState import GameState
 from .Player import Player
-from ai.Minimax import choose_ai_move
+from ai.Minimax import choose_ai_move, TIME_BUDGET, MAX_DEPTH
+from ai.MCTS import MCTS
+from ai.SearchStats import SearchStats
+from ai.TranspositionTable import TranspositionTable
+
+ENGINES = ("minimax", "mcts")
+
+# mỗi nước AI đi ghi một dòng JSON SearchStats ở mức INFO (main.py cấu hình nơi ghi log)
+logger = logging.getLogger(__name__)
 
 
 class AIPlayer(Player):
+    def __init__(self, color: int, name: str = "", time_budget: float = TIME_BUDGET,
+                 workers: int = 1, engine: str = "minimax", max_depth: int = MAX_DEPTH):
+        super().__init__(color, name)
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine}")
+        self.engine = engine
+        self.time_budget = time_budget  # giây suy nghĩ cho mỗi nước (None: tìm đủ max_depth)
+        self.max_depth = max_depth
+        self.workers = workers          # > 1: chia nước ở gốc cho nhiều tiến trình
+        # Bảng chuyển vị / cây MCTS sống suốt ván (controller tạo AIPlayer mới mỗi ván)
+        self.tt = TranspositionTable()
+        self.mcts = MCTS(color, time_budget) if engine == "mcts" else None
+        # Số liệu tìm kiếm của nước gần nhất
+        self.stats = SearchStats(engine)
+
+    def search(self, state: GameState, stop=None) -> Tuple[Optional[Tuple[int, int]], SearchStats]:
+        """Chọn nước đi và trả về kèm SearchStats của lượt tìm kiếm; stop: threading.Event để hủy."""
+        stats = SearchStats(self.engine)
+        if self.mcts is not None:
+            move = self.mcts.choose_move(state.board, stop, state.consecutive_passes)
+            stats.nodes = self.mcts.stats["playouts"]
+            stats.seconds = self.mcts.stats["seconds"]
+        else:
+            move = choose_ai_move(
+                state.board, self.color, self.tt, self.time_budget, self.max_depth,
+                workers=self.workers, stop=stop, stats=stats,
+            )
+        self.stats = stats
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("%s", json.dumps({"player": self.name, "move": move, **stats.as_dict()}))
+        return move, stats
+
     def choose_move(
-        self, state: GameState, click_pos: Optional[Tuple[int, int]] = None
+        self, state: GameState, click_pos: Optional[Tuple[int, int]] = None, stop=None
     ):
-        return choose_ai_move(state.board, self.color)
+        return self.search(state, stop)[0]
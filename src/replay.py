@@ -0,0 +1,107 @@
+# replay.py
+#
+# Phát lại các kho ván SGF qua Board.apply_move để kiểm tra hồi quy luật chơi và đo tốc độ.
+# File / thư mục được đọc theo luồng, từng ván một, nên bộ nhớ không phụ thuộc số ván.
+# In số ván, số thế cờ, thế cờ / giây, các ván lỗi và một digest của thế cờ cuối mọi ván
+# (giống nhau giữa các backend và giữa các phiên bản nếu luật không đổi).
+# Ví dụ (chạy trong thư mục src):
+#   python replay.py ../games
+#   python replay.py archive.sgf.gz --backend flat --no-superko --json
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Iterator
+from models.FlatBoard import BOARD_BACKENDS
+from models.Sgf import SgfError, iter_game_texts, parse_game, replay
+
+SGF_SUFFIXES = (".sgf", ".sgf.gz")
+
+
+def iter_paths(paths) -> Iterator[str]:
+    """File được chỉ định, hoặc mọi file .sgf / .sgf.gz trong thư mục (duyệt dần, đã sắp xếp)."""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(SGF_SUFFIXES):
+                    yield os.path.join(root, name)
+
+
+def run(paths, backend: str = "list", superko: bool = True, max_errors: int = 10) -> dict:
+    board_cls = BOARD_BACKENDS[backend]
+    digest = hashlib.blake2b(digest_size=8)
+    games = positions = failed = 0
+    errors = []
+    start = time.perf_counter()
+    for path in iter_paths(paths):
+        texts = iter_game_texts(path)
+        index = 0
+        while True:
+            try:
+                text = next(texts, None)
+            except (OSError, SgfError, UnicodeError) as e:
+                # file hỏng / không đọc được: bỏ phần còn lại của file
+                failed += 1
+                if len(errors) < max_errors:
+                    errors.append(f"{path}: {e}")
+                break
+            if text is None:
+                break
+            index += 1
+            games += 1
+            board = None
+            try:
+                for board in replay(parse_game(text), board_cls, superko):
+                    positions += 1
+            except SgfError as e:
+                failed += 1
+                if len(errors) < max_errors:
+                    errors.append(f"{path} game {index}: {e}")
+                continue
+            digest.update((board.hash if board is not None else 0).to_bytes(8, "little"))
+    seconds = time.perf_counter() - start
+    return {
+        "backend": backend,
+        "games": games,
+        "failed": failed,
+        "positions": positions,
+        "seconds": round(seconds, 3),
+        "positions_per_second": round(positions / seconds) if seconds > 0 else 0,
+        "games_per_second": round(games / seconds, 1) if seconds > 0 else 0,
+        "digest": digest.hexdigest(),
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay SGF game collections through the board rules")
+    parser.add_argument("paths", nargs="+", help="SGF files (may hold many games, .gz ok) or directories")
+    parser.add_argument("--backend", choices=sorted(BOARD_BACKENDS), default="list")
+    parser.add_argument("--no-superko", action="store_true",
+                        help="allow repeated positions (games played under Japanese rules)")
+    parser.add_argument("--max-errors", type=int, default=10, help="number of failed games to list")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args()
+
+    result = run(args.paths, args.backend, not args.no_superko, args.max_errors)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"backend {result['backend']}: {result['games']} games, {result['positions']} positions "
+              f"in {result['seconds']:.2f}s ({result['positions_per_second']} positions/s, "
+              f"{result['games_per_second']} games/s)")
+        print(f"failed: {result['failed']}  digest: {result['digest']}")
+        for line in result["errors"]:
+            print(f"  {line}")
+    sys.exit(1 if result["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
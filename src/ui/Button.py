@@ -23,6 +23,9 @@ class Button:
         self.text_color = text_color
         self.border_color = border_color
         self.border_radius = border_radius
+        # nhãn render sẵn, chỉ render lại khi text đổi
+        self._label = None
+        self._label_text = None
 
     def draw(self, screen, mouse_pos):
         is_hover = self.rect.collidepoint(mouse_pos)
@@ -42,9 +45,10 @@ class Button:
             border_radius=self.border_radius,
         )
 
-        txt_surf = self.font.render(self.text, True, self.text_color)
-        txt_rect = txt_surf.get_rect(center=self.rect.center)
-        screen.blit(txt_surf, txt_rect)
+        if self._label_text != self.text:
+            self._label = self.font.render(self.text, True, self.text_color)
+            self._label_text = self.text
+        screen.blit(self._label, self._label.get_rect(center=self.rect.center))
 
     def hit_test(self, pos):
         return self.rect.collidepoint(pos)
@@ -1,7 +1,7 @@
 # ui/GameUI.py
 
 import pygame
-from models.GameState import BOARD_SIZE, BLACK, WHITE
+from models.GameState import BOARD_SIZE, BLACK, WHITE, EMPTY
 from ui.Button import Button
 
 
@@ -14,6 +14,8 @@ BOARD_PIXEL_SIZE = BOARD_SIZE * CELL_SIZE + 2 * BOARD_MARGIN
 PANEL_WIDTH = 260
 WINDOW_WIDTH = BOARD_PIXEL_SIZE + PANEL_WIDTH
 WINDOW_HEIGHT = BOARD_PIXEL_SIZE
+STAR_POINTS = [(2, 2), (2, 6), (4, 4), (6, 2), (6, 6)]
+TEXT_CACHE_LIMIT = 256   # số chữ đã render giữ trong cache
 
 
 class GameUI:
@@ -23,6 +25,7 @@ class GameUI:
         self.font = pygame.font.SysFont("Arial", 20)
         self.big_font = pygame.font.SysFont("Arial", 36, bold=True)
         self.title_font = pygame.font.SysFont("Arial", 48, bold=True)
+        self.small_font = pygame.font.SysFont("Consolas", 15)
 
         panel_x = BOARD_PIXEL_SIZE + 30
         btn_width = 200
@@ -77,6 +80,17 @@ class GameUI:
         )
 
         self.board_rect = pygame.Rect(0, 0, BOARD_PIXEL_SIZE, BOARD_PIXEL_SIZE)
+        self.panel_rect = pygame.Rect(BOARD_PIXEL_SIZE, 0, PANEL_WIDTH, WINDOW_HEIGHT)
+        self.panel_buttons = (self.btn_newgame, self.btn_pass, self.btn_resign,
+                              self.btn_mode_hvh, self.btn_mode_hvai)
+
+        # Vẽ theo vùng bẩn: chỉ vẽ lại ô / panel khác với frame trước
+        self.text_cache = {}
+        self._build_sprites()
+        self._cells = [[None] * BOARD_SIZE for _ in range(BOARD_SIZE)]  # (quân, nước cuối, quân mờ) đã vẽ
+        self._panel_key = None
+        self._frame_key = None
+        self._full = True
 
         # Game Over Overlay (tạo 1 lần)
         self.overlay_surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
@@ -84,7 +98,7 @@ class GameUI:
 
         # Nút New Game trong Game Over
         self.go_newgame_btn = Button(
-            pygame.Rect(0, 0, 300, 70),
+            pygame.Rect((WINDOW_WIDTH - 200) // 2, (WINDOW_HEIGHT + 320) // 2 - 70, 200, 50),
             "New Game",
             self.big_font,
             base_color=(0, 160, 0),
@@ -125,99 +139,148 @@ class GameUI:
             return "mode_hvai"
         return None
 
-    def draw_board(self, screen, mouse_pos):
-        screen.fill(BOARD_BG)
+    # ----------------- bộ đệm vẽ -----------------
 
-        # lưới
+    def _build_sprites(self):
+        # Bàn cờ trống (nền, lưới, hoshi) và quân cờ / quân mờ vẽ sẵn một lần
+        self.board_surface = pygame.Surface((BOARD_PIXEL_SIZE, BOARD_PIXEL_SIZE))
+        surf = self.board_surface
+        surf.fill(BOARD_BG)
         for i in range(BOARD_SIZE):
             y = BOARD_MARGIN + i * CELL_SIZE
-            pygame.draw.line(screen, LINE_COLOR, (BOARD_MARGIN, y),
+            pygame.draw.line(surf, LINE_COLOR, (BOARD_MARGIN, y),
                              (BOARD_MARGIN + (BOARD_SIZE - 1) * CELL_SIZE, y), 2)
             x = BOARD_MARGIN + i * CELL_SIZE
-            pygame.draw.line(screen, LINE_COLOR, (x, BOARD_MARGIN),
+            pygame.draw.line(surf, LINE_COLOR, (x, BOARD_MARGIN),
                              (x, BOARD_MARGIN + (BOARD_SIZE - 1) * CELL_SIZE), 2)
+        for r, c in STAR_POINTS:
+            pygame.draw.circle(surf, LINE_COLOR, (BOARD_MARGIN + c * CELL_SIZE,
+                                                  BOARD_MARGIN + r * CELL_SIZE), 5)
 
-        # star points
-        star_points = [(2, 2), (2, 6), (4, 4), (6, 2), (6, 6)]
-        for r, c in star_points:
-            cx = BOARD_MARGIN + c * CELL_SIZE
-            cy = BOARD_MARGIN + r * CELL_SIZE
-            pygame.draw.circle(screen, LINE_COLOR, (cx, cy), 5)
-
-        # quân cờ
         radius = CELL_SIZE // 2 - 3
-        board = self.controller.board
+        center = (CELL_SIZE // 2, CELL_SIZE // 2)
+        self.stone_sprites = {}
+        self.ghost_sprites = {}
+        for color, fill, ghost_fill in ((BLACK, (0, 0, 0), (0, 0, 0, 80)),
+                                        (WHITE, (255, 255, 255), (255, 255, 255, 100))):
+            stone = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
+            pygame.draw.circle(stone, fill, center, radius)
+            pygame.draw.circle(stone, (0, 0, 0), center, radius, 2)
+            self.stone_sprites[color] = stone
+            ghost = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
+            pygame.draw.circle(ghost, ghost_fill, center, radius)
+            pygame.draw.circle(ghost, (0, 0, 0, 150), center, radius, 2)
+            self.ghost_sprites[color] = ghost
+
+    def text(self, font, string: str, color):
+        """font.render có cache theo (font, chuỗi, màu)."""
+        key = (id(font), string, color)
+        surf = self.text_cache.get(key)
+        if surf is None:
+            if len(self.text_cache) >= TEXT_CACHE_LIMIT:
+                self.text_cache.clear()   # chuỗi đổi liên tục (đồng hồ suy nghĩ) không làm cache phình
+            surf = self.text_cache[key] = font.render(string, True, color)
+        return surf
+
+    def invalidate(self):
+        """Buộc frame sau vẽ lại toàn bộ cửa sổ (ví dụ sau khi tạo lại màn hình)."""
+        self._full = True
+
+    @staticmethod
+    def cell_rect(r: int, c: int) -> pygame.Rect:
+        return pygame.Rect(BOARD_MARGIN + c * CELL_SIZE - CELL_SIZE // 2,
+                           BOARD_MARGIN + r * CELL_SIZE - CELL_SIZE // 2, CELL_SIZE, CELL_SIZE)
+
+    # ----------------- vẽ -----------------
+
+    def draw_board(self, screen, mouse_pos, full: bool = False):
+        """
+        Vẽ lại các ô có (quân, đánh dấu nước cuối, quân mờ) khác frame trước, hoặc cả bàn
+        nếu full. Trả về danh sách vùng đã vẽ.
+        """
+        controller = self.controller
+        grid = controller.board.grid
+        last_move = controller.last_move
+
+        # ghost stone
+        ghost = None
+        if (not controller.game_over) and (not controller.is_current_ai()):
+            coord = self.pixel_to_board(mouse_pos)
+            if coord and controller.board.is_empty(*coord):
+                ghost = coord
+        ghost_color = controller.state.current_player
+
+        if full:
+            screen.blit(self.board_surface, (0, 0))
+        dirty = []
+        cells = self._cells
         for r in range(BOARD_SIZE):
+            row = grid[r]
+            drawn = cells[r]
             for c in range(BOARD_SIZE):
-                v = board.grid[r][c]
-                if v == 0:
+                v = row[c]
+                cell = (v, (r, c) == last_move, ghost_color if (r, c) == ghost else EMPTY)
+                if cell == drawn[c] and not full:
                     continue
-                cx = BOARD_MARGIN + c * CELL_SIZE
-                cy = BOARD_MARGIN + r * CELL_SIZE
-                color = (0, 0, 0) if v == BLACK else (255, 255, 255)
-                pygame.draw.circle(screen, color, (cx, cy), radius)
-                pygame.draw.circle(screen, (0, 0, 0), (cx, cy), radius, 2)
-        
-        # Highlight nước đi cuối
-        if self.controller.last_move:
-            lr, lc = self.controller.last_move
-            if 0 <= lr < BOARD_SIZE and 0 <= lc < BOARD_SIZE:
-                cx = BOARD_MARGIN + lc * CELL_SIZE
-                cy = BOARD_MARGIN + lr * CELL_SIZE
-                
-                
-                # Lấy màu quân tại vị trí last move
-                stone_color = self.controller.board.grid[lr][lc]
-                if stone_color == BLACK:
-                    dot_color = (255, 255, 255) # Quân đen → chấm trắng
-                elif stone_color == WHITE:
-                    dot_color = (0, 0, 0) # Quân trắng → chấm đen
-                else:
-                    dot_color = (255, 255, 255)
-
-                # Vẽ chấm nhỏ nổi bật chính giữa quân cờ
-                pygame.draw.circle(screen, dot_color, (cx, cy), 11)        # Chấm to
-                pygame.draw.circle(screen, (255, 255, 255), (cx, cy), 11, 3)  # Viền trắng lấp lánh
-                pygame.draw.circle(screen, dot_color, (cx, cy), 5)         # Chấm nhỏ giữa (đậm hơn)
-        
-        
-        # ghost stone
-        if (not self.controller.game_over) and (not self.controller.is_current_ai()):
-            coord = self.pixel_to_board(mouse_pos)
-            if coord and board.is_empty(*coord):
-                hr, hc = coord
-                cx = BOARD_MARGIN + hc * CELL_SIZE
-                cy = BOARD_MARGIN + hr * CELL_SIZE
-                ghost_color = (0, 0, 0, 80) if self.controller.state.current_player == BLACK else (255, 255, 255, 100)
-                ghost = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
-                pygame.draw.circle(ghost, ghost_color, (CELL_SIZE//2, CELL_SIZE//2), radius)
-                pygame.draw.circle(ghost, (0, 0, 0, 150), (CELL_SIZE//2, CELL_SIZE//2), radius, 2)
-                screen.blit(ghost, (cx - CELL_SIZE//2, cy - CELL_SIZE//2))
-
-    def draw_panel(self, screen, mouse_pos):
-        panel_x = BOARD_PIXEL_SIZE + 30
-
-        title_surf = self.title_font.render("Game Go 9x9", True, (0, 0, 0))
-        screen.blit(title_surf, (panel_x, 20))
+                drawn[c] = cell
+                rect = self.cell_rect(r, c)
+                if not full:
+                    screen.blit(self.board_surface, rect, rect)
+                    dirty.append(rect)
+                if v != EMPTY:
+                    screen.blit(self.stone_sprites[v], rect)
+                    if cell[1]:
+                        # Highlight nước đi cuối: quân đen → chấm trắng, quân trắng → chấm đen
+                        dot_color = (255, 255, 255) if v == BLACK else (0, 0, 0)
+                        pygame.draw.circle(screen, dot_color, rect.center, 11)        # Chấm to
+                        pygame.draw.circle(screen, (255, 255, 255), rect.center, 11, 3)  # Viền trắng
+                        pygame.draw.circle(screen, dot_color, rect.center, 5)         # Chấm nhỏ giữa
+                elif cell[2] != EMPTY:
+                    screen.blit(self.ghost_sprites[cell[2]], rect)
+        if full:
+            return [self.board_rect]
+        return dirty
+
+    def draw_panel(self, screen, mouse_pos, full: bool = False):
+        """Vẽ lại cả panel khi nội dung hoặc trạng thái hover của nút đổi; trả về vùng đã vẽ."""
+        controller = self.controller
+        turn_text = "Turn: Black" if controller.state.current_player == BLACK else "Turn: White"
+        if controller.is_ai_thinking():
+            turn_text += f"  (thinking {controller.ai_thinking_time():.1f}s)"
+        mode_text = "Human vs Human" if controller.mode == "HUMAN_VS_HUMAN" else "Human vs AI"
+        key = (turn_text, controller.captured_black, controller.captured_white, mode_text,
+               tuple(button.hit_test(mouse_pos) for button in self.panel_buttons))
+        if key == self._panel_key and not full:
+            return []
+        self._panel_key = key
 
-        turn_text = "Turn: Black" if self.controller.state.current_player == BLACK else "Turn: White"
-        turn_surf = self.font.render(turn_text, True, (0, 0, 0))
-        screen.blit(turn_surf, (panel_x, 70))
-
-        cap_label = self.font.render("Captured:", True, (0, 0, 0))
-        screen.blit(cap_label, (panel_x, 100))
-        screen.blit(self.font.render(f"Black: {self.controller.captured_black}", True, (0, 0, 0)), (panel_x + 10, 125))
-        screen.blit(self.font.render(f"White: {self.controller.captured_white}", True, (0, 0, 0)), (panel_x + 10, 150))
-
-        self.btn_newgame.draw(screen, mouse_pos)
-        self.btn_pass.draw(screen, mouse_pos)
-        self.btn_resign.draw(screen, mouse_pos)
-        self.btn_mode_hvh.draw(screen, mouse_pos)
-        self.btn_mode_hvai.draw(screen, mouse_pos)
-
-        mode_text = "Human vs Human" if self.controller.mode == "HUMAN_VS_HUMAN" else "Human vs AI"
-        screen.blit(self.font.render("Mode:", True, (0, 0, 0)), (panel_x, self.btn_mode_hvh.rect.y - 40))
-        screen.blit(self.font.render(mode_text, True, (0, 0, 120)), (panel_x + 65, self.btn_mode_hvh.rect.y - 40))
+        panel_x = BOARD_PIXEL_SIZE + 30
+        screen.fill(BOARD_BG, self.panel_rect)
+        black = (0, 0, 0)
+        screen.blit(self.text(self.title_font, "Game Go 9x9", black), (panel_x, 20))
+        screen.blit(self.text(self.font, turn_text, black), (panel_x, 70))
+        screen.blit(self.text(self.font, "Captured:", black), (panel_x, 100))
+        screen.blit(self.text(self.font, f"Black: {controller.captured_black}", black), (panel_x + 10, 125))
+        screen.blit(self.text(self.font, f"White: {controller.captured_white}", black), (panel_x + 10, 150))
+
+        for button in self.panel_buttons:
+            button.draw(screen, mouse_pos)
+
+        screen.blit(self.text(self.font, "Mode:", black), (panel_x, self.btn_mode_hvh.rect.y - 40))
+        screen.blit(self.text(self.font, mode_text, (0, 0, 120)), (panel_x + 65, self.btn_mode_hvh.rect.y - 40))
+        return [self.panel_rect]
+
+    def draw_debug(self, screen):
+        # Bảng số liệu tìm kiếm của nước AI gần nhất, vẽ đè góc trên bên trái bàn cờ
+        stats = self.controller.last_stats
+        lines = stats.summary_lines() if stats is not None else ["no AI search yet"]
+        line_h = self.small_font.get_linesize()
+        width = max(self.small_font.size(line)[0] for line in lines) + 16
+        box = pygame.Surface((width, line_h * len(lines) + 12), pygame.SRCALPHA)
+        box.fill((0, 0, 0, 170))
+        for i, line in enumerate(lines):
+            box.blit(self.text(self.small_font, line, (230, 230, 230)), (8, 6 + i * line_h))
+        screen.blit(box, (6, 6))
 
     def draw_game_over(self, screen, mouse_pos):
         # Nền mờ
@@ -233,18 +296,18 @@ class GameUI:
         pygame.draw.rect(screen, (160, 90, 30), (dialog_x, dialog_y, dialog_w, dialog_h), 10, border_radius=25)
 
         # Tiêu đề
-        go_text = self.title_font.render("Game Over", True, (180, 0, 0))
+        go_text = self.text(self.title_font, "Game Over", (180, 0, 0))
         screen.blit(go_text, (dialog_x + (dialog_w - go_text.get_width())//2, dialog_y + 30))
 
         # Nội dung chính (Resign hoặc thắng bằng điểm)
         if self.controller.end_reason == "resign":
-            result_surf = self.big_font.render(self.controller.result_text, True, (200, 0, 0))
+            result_surf = self.text(self.big_font, self.controller.result_text, (200, 0, 0))
             screen.blit(result_surf, (dialog_x + (dialog_w - result_surf.get_width())//2, dialog_y + 90))
             score_y = 150
         else:
             # Hiển thị ai thắng (chỉ dòng đầu)
             winner_line = self.controller.result_text.split(" - ")[0]
-            winner_surf = self.big_font.render(winner_line, True, (0, 0, 180))
+            winner_surf = self.text(self.big_font, winner_line, (0, 0, 180))
             screen.blit(winner_surf, (dialog_x + (dialog_w - winner_surf.get_width())//2, dialog_y + 90))
             score_y = 140
 
@@ -253,8 +316,8 @@ class GameUI:
         b_text = f"Black: {black_score:.1f}"
         w_text = f"White: {white_score:.1f} (+7.5 komi)"
 
-        b_surf = self.font.render(b_text, True, (0, 0, 0))
-        w_surf = self.font.render(w_text, True, (0, 0, 0))
+        b_surf = self.text(self.font, b_text, (0, 0, 0))
+        w_surf = self.text(self.font, w_text, (0, 0, 0))
 
         screen.blit(b_surf, (dialog_x + (dialog_w - b_surf.get_width())//2, dialog_y + score_y))
         screen.blit(w_surf, (dialog_x + (dialog_w - w_surf.get_width())//2, dialog_y + score_y + 35))
@@ -267,12 +330,40 @@ class GameUI:
         self.go_newgame_btn.draw(screen, mouse_pos)
 
     def draw(self, screen):
+        """
+        Vẽ những gì đổi so với frame trước và trả về danh sách vùng cần cập nhật
+        (cho pygame.display.update); danh sách rỗng nghĩa là không có gì đổi.
+        """
         mouse_pos = pygame.mouse.get_pos()
-
-        # Vẽ bàn cờ + panel bình thường
-        self.draw_board(screen, mouse_pos)
-        self.draw_panel(screen, mouse_pos)
+        controller = self.controller
+
+        # Lớp phủ (bảng debug, Game Over) đổi thì vẽ lại toàn bộ; đang Game Over thì
+        # chỉ nút New Game có thể đổi
+        frame_key = (
+            controller.game_over,
+            controller.show_debug,
+            controller.last_stats if controller.show_debug else None,
+            self.go_newgame_btn.hit_test(mouse_pos) if controller.game_over else None,
+        )
+        if frame_key != self._frame_key:
+            self._frame_key = frame_key
+            self._full = True
+        elif controller.game_over:
+            return []
+        full = self._full
+        self._full = False
+
+        dirty = self.draw_board(screen, mouse_pos, full)
+        if controller.show_debug and dirty and not full:
+            # ô dưới bảng debug đổi: vẽ lại cả bàn để bảng bán trong suốt không bị chồng lên nhau
+            dirty = self.draw_board(screen, mouse_pos, True)
+        if controller.show_debug and dirty:
+            self.draw_debug(screen)
+        dirty += self.draw_panel(screen, mouse_pos, full)
 
         # Nếu game over → vẽ overlay đẹp
-        if self.controller.game_over:
-            self.draw_game_over(screen, mouse_pos)
\ No newline at end of file
+        if controller.game_over:
+            self.draw_game_over(screen, mouse_pos)
+        if full:
+            return [screen.get_rect()]
+        return dirty